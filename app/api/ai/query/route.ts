@@ -1,6 +1,6 @@
 import { NextRequest, NextResponse } from 'next/server'
 import { loadCampaignData } from '@/lib/server-data-service'
-import { KEYWORDS, PLATFORM_MAP } from '@/lib/constants'
+import { KEYWORDS, PLATFORM_MAP, MAX_BATCH_QUERIES } from '@/lib/constants'
 
 // ============================================================================
 // HELPER FUNCTIONS - Clean, reusable data processing utilities
@@ -50,20 +50,40 @@ function aggregateByDimension(data: any[], dimensionKey: string): Map<string, Me
   
   for (const row of data) {
     const dimensionValue = row.dimensions[dimensionKey] || 'Unknown'
-    const existing = aggregated.get(dimensionValue) || { spend: 0, revenue: 0, impressions: 0, clicks: 0, conversions: 0 }
-    
-    aggregated.set(dimensionValue, {
-      spend: existing.spend + row.metrics.spend,
-      revenue: existing.revenue + row.metrics.revenue,
-      impressions: existing.impressions + row.metrics.impressions,
-      clicks: existing.clicks + row.metrics.clicks,
-      conversions: existing.conversions + row.metrics.conversions
-    })
+    let totals = aggregated.get(dimensionValue)
+    if (!totals) {
+      totals = { spend: 0, revenue: 0, impressions: 0, clicks: 0, conversions: 0 }
+      aggregated.set(dimensionValue, totals)
+    }
+    
+    // Accumulate in place rather than allocating a new totals object per row
+    const metrics = row.metrics
+    totals.spend += metrics.spend
+    totals.revenue += metrics.revenue
+    totals.impressions += metrics.impressions
+    totals.clicks += metrics.clicks
+    totals.conversions += metrics.conversions
   }
   
   return aggregated
 }
 
+// Sum the core metrics over a set of rows in a single pass
+function sumMetrics(data: any[]): Metrics {
+  const totals = { spend: 0, revenue: 0, impressions: 0, clicks: 0, conversions: 0 }
+  
+  for (const row of data) {
+    const metrics = row.metrics
+    totals.spend += metrics.spend
+    totals.revenue += metrics.revenue
+    totals.impressions += metrics.impressions
+    totals.clicks += metrics.clicks
+    totals.conversions += metrics.conversions
+  }
+  
+  return totals
+}
+
 // Convert aggregated data to analysis items with calculated metrics
 function createAnalysisItems(aggregated: Map<string, Metrics>): AnalysisItem[] {
   return Array.from(aggregated.entries())
@@ -161,41 +181,121 @@ setInterval(() => {
   expiredSessions.forEach(sessionId => cleanupSession(sessionId))
 }, 5 * 60 * 1000)
 
+// ============================================================================
+// QUERY KEYWORDS - Built once at module load instead of on every query
+// ============================================================================
+
+// Words that mark a follow-up as a chart request
+const CHART_KEYWORDS = [
+  'chart', 'graph', 'visualization', 'visualize', 'visual', 'plot', 'diagram', 'figure',
+  'download', 'export', 'save', 'get', 'show', 'display', 'present', 'create', 'generate',
+  'make', 'build', 'render', 'draw', 'illustrate', 'depict', 'represent'
+]
+
+// Words that point back at the previous answer
+const CONTEXT_KEYWORDS = [
+  'this', 'that', 'it', 'these', 'those', 'the data', 'the results', 'the information',
+  'what you showed', 'what you found', 'the analysis', 'the performance', 'the metrics'
+]
+
+// Phrasings that ask for a chart on their own
+const CHART_REQUEST_PATTERNS = [
+  'can you show me', 'could you show me', 'would you show me',
+  'can you create', 'could you create', 'would you create',
+  'can you make', 'could you make', 'would you make',
+  'i would like', 'i want', 'i need',
+  'please show', 'please create', 'please make',
+  'show me a', 'create a', 'make a',
+  'turn this into', 'convert this to', 'transform this into',
+  'give me a', 'provide me with', 'send me a',
+  'i need a', 'i want a', 'i would like a',
+  'can i get', 'could i get', 'would i get',
+  'is there a', 'do you have a', 'can you provide a'
+]
+
+// Questions about the data timeframe, and periods the demo data does not cover
+const TIME_QUERIES = {
+  explicitTime: [
+    'when was this data collected', 'what time period', 'what timeframe', 'what dates',
+    'what month is this', 'what year is this', 'tell me about the time period',
+    'what period is this', 'how long is this data'
+  ],
+  otherMonths: ['january', 'february', 'march', 'april', 'may', 'july', 'august', 'september', 'october', 'november', 'december'],
+  otherYears: ['2023', '2022', '2021', '2020', '2019', '2018', '2017', '2016', '2015']
+}
+
+// Any of the other months as a whole word, matched in one pass
+const OTHER_MONTHS_PATTERN = new RegExp(`\\b(?:${TIME_QUERIES.otherMonths.join('|')})\\b`, 'i')
+
+// Platform comparison queries
+const PLATFORM_COMPARISON_KEYWORDS = [
+  'platform comparison', 'compare platform', 'which platform', 'platform should i focus on',
+  'show me platform comparison', 'top performing platform', 'platform rankings',
+  'compare platform performance'
+]
+
+// Platforms with a dedicated performance summary
+const PLATFORM_NAMES = ['meta', 'dv360', 'amazon', 'cm360', 'sa360', 'tradedesk']
+
+// Words that ask how a named platform is doing
+const PLATFORM_QUERY_KEYWORDS = ['performing', 'performance', 'metrics', 'results', 'how is', 'what is']
+
+// Campaign-specific queries
+const CAMPAIGN_KEYWORDS = [
+  'campaign', 'campaigns', 'best campaign', 'top campaign', 'worst campaign',
+  'campaign rankings', 'campaign performance', 'campaigns doing well',
+  'campaigns performing', 'performance of each campaign',
+  'compare campaign performance', 'performance of each campaign'
+]
+
+// Audience-specific queries
+const AUDIENCE_KEYWORDS = [
+  'audience', 'audiences', 'audience performance', 'audience breakdown',
+  'audience segments', 'audience targeting', 'audience insights',
+  'segments', 'targeting', 'audience recommendations',
+  'audience segments performed best', 'audience targeting worked best',
+  'audience segments', 'audience targeting'
+]
+
+// Creative-specific queries
+const CREATIVE_KEYWORDS = [
+  'creative', 'creatives', 'creative performance', 'creative formats',
+  'creative elements', 'creative optimization', 'creative recommendations',
+  'creative by platform', 'creative breakdown', 'creative insights',
+  'creative formats worked best', 'creative elements drove', 'creative recommendations do you have',
+  'creative formats', 'creative elements', 'creative recommendations'
+]
+
+// Optimization-specific queries
+const OPTIMIZATION_KEYWORDS = [
+  'optimize', 'optimization', 'opportunities', 'recommendations',
+  'where should we put more money', 'focus on improving', 'biggest opportunities',
+  'what should we optimize', 'optimization opportunities', 'strategic recommendations',
+  'what are our opportunities', 'how can we improve performance', 'what optimization opportunities exist',
+  'what should i focus on improving', 'what are the biggest opportunities', 'improve', 'improvement',
+  'opportunities', 'biggest opportunities', 'focus on improving', 'improve performance', 'put more money'
+]
+
+// Chart request queries
+const CHART_REQUEST_KEYWORDS = [
+  'show me a graph', 'create a chart', 'visualize this data', 'put this in a chart',
+  'show me a bar chart', 'make this into a graph', 'chart this data', 'graph this',
+  'show me a chart', 'visualize', 'graph', 'chart', 'plot this data'
+]
+
+// Campaigns with a dedicated performance summary
+const PERFORMANCE_CAMPAIGNS = ['FreshNest Summer Grilling', 'FreshNest Back to School', 'FreshNest Holiday Recipes', 'FreshNest Pantry Staples']
+
 function handleDrillDownQuery(query: string, data: any[], context: any) {
   const lowerQuery = query.toLowerCase()
   
   if (context.lastContext) {
     const lastResult = context.lastContext.result
     
-    const chartKeywords = [
-      'chart', 'graph', 'visualization', 'visualize', 'visual', 'plot', 'diagram', 'figure',
-      'download', 'export', 'save', 'get', 'show', 'display', 'present', 'create', 'generate',
-      'make', 'build', 'render', 'draw', 'illustrate', 'depict', 'represent'
-    ]
-    
-    const contextKeywords = [
-      'this', 'that', 'it', 'these', 'those', 'the data', 'the results', 'the information',
-      'what you showed', 'what you found', 'the analysis', 'the performance', 'the metrics'
-    ]
-    
-    const hasChartKeyword = chartKeywords.some(keyword => lowerQuery.includes(keyword))
-    const hasContextKeyword = contextKeywords.some(keyword => lowerQuery.includes(keyword))
-    
-    const additionalPatterns = [
-      'can you show me', 'could you show me', 'would you show me',
-      'can you create', 'could you create', 'would you create',
-      'can you make', 'could you make', 'would you make',
-      'i would like', 'i want', 'i need',
-      'please show', 'please create', 'please make',
-      'show me a', 'create a', 'make a',
-      'turn this into', 'convert this to', 'transform this into',
-      'give me a', 'provide me with', 'send me a',
-      'i need a', 'i want a', 'i would like a',
-      'can i get', 'could i get', 'would i get',
-      'is there a', 'do you have a', 'can you provide a'
-    ]
-    
-    const hasAdditionalPattern = additionalPatterns.some(pattern => lowerQuery.includes(pattern))
+    const hasChartKeyword = CHART_KEYWORDS.some(keyword => lowerQuery.includes(keyword))
+    const hasContextKeyword = CONTEXT_KEYWORDS.some(keyword => lowerQuery.includes(keyword))
+    
+    const hasAdditionalPattern = CHART_REQUEST_PATTERNS.some(pattern => lowerQuery.includes(pattern))
     
     if ((hasChartKeyword && hasContextKeyword) || hasAdditionalPattern) {
       const lastDataType = lastResult.data?.type
@@ -301,18 +401,8 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
   // ============================================================================
   
   // Handle time-related queries
-  const timeHandlers = {
-    explicitTime: [
-      'when was this data collected', 'what time period', 'what timeframe', 'what dates',
-      'what month is this', 'what year is this', 'tell me about the time period',
-      'what period is this', 'how long is this data'
-    ],
-    otherMonths: ['january', 'february', 'march', 'april', 'may', 'july', 'august', 'september', 'october', 'november', 'december'],
-    otherYears: ['2023', '2022', '2021', '2020', '2019', '2018', '2017', '2016', '2015']
-  }
-
   // Check for explicit time queries
-  if (timeHandlers.explicitTime.some(timeQuery => lowerQuery.includes(timeQuery))) {
+  if (TIME_QUERIES.explicitTime.some(timeQuery => lowerQuery.includes(timeQuery))) {
     const content = `📅 **Data Timeframe**:\n\n` +
       `• **Period**: June 1-30, 2024\n` +
       `• **Duration**: 30 days of campaign data\n` +
@@ -345,11 +435,8 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
   }
 
   // Check for other months/years
-  const mentionsOtherMonth = timeHandlers.otherMonths.some(month => {
-    const monthPattern = new RegExp(`\\b${month}\\b`, 'i')
-    return monthPattern.test(query)
-  })
-  const mentionsOtherYear = timeHandlers.otherYears.some(year => query.includes(year))
+  const mentionsOtherMonth = OTHER_MONTHS_PATTERN.test(query)
+  const mentionsOtherYear = TIME_QUERIES.otherYears.some(year => query.includes(year))
   
   if (mentionsOtherMonth || mentionsOtherYear) {
     const content = 'This demo is built on campaigns that ran in June 2024. No data is available for other months.'
@@ -423,13 +510,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
   }
 
   // Platform comparison queries
-  const platformComparisonKeywords = [
-    'platform comparison', 'compare platform', 'which platform', 'platform should i focus on',
-    'show me platform comparison', 'top performing platform', 'platform rankings',
-    'compare platform performance'
-  ]
-  
-  if (platformComparisonKeywords.some(keyword => lowerQuery.includes(keyword))) {
+  if (PLATFORM_COMPARISON_KEYWORDS.some(keyword => lowerQuery.includes(keyword))) {
     const aggregated = aggregateByDimension(data, 'platform')
     const analysis = createAnalysisItems(aggregated)
     
@@ -465,11 +546,8 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
   }
 
   // Additional platform-specific queries (catch-all for platform performance)
-  const platformNames = ['meta', 'dv360', 'amazon', 'cm360', 'sa360', 'tradedesk']
-  const platformQueryKeywords = ['performing', 'performance', 'metrics', 'results', 'how is', 'what is']
-  
-  for (const platformName of platformNames) {
-    if (lowerQuery.includes(platformName) && platformQueryKeywords.some(keyword => lowerQuery.includes(keyword))) {
+  for (const platformName of PLATFORM_NAMES) {
+    if (lowerQuery.includes(platformName) && PLATFORM_QUERY_KEYWORDS.some(keyword => lowerQuery.includes(keyword))) {
       const platformData = data.filter(row => row.dimensions.platform.toLowerCase() === platformName.toLowerCase())
       
       if (platformData.length > 0) {
@@ -504,14 +582,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
   // ============================================================================
   
   // Campaign-specific queries
-  const campaignKeywords = [
-    'campaign', 'campaigns', 'best campaign', 'top campaign', 'worst campaign',
-    'campaign rankings', 'campaign performance', 'campaigns doing well',
-    'campaigns performing', 'performance of each campaign',
-    'compare campaign performance', 'performance of each campaign'
-  ]
-  
-  if (campaignKeywords.some(keyword => lowerQuery.includes(keyword))) {
+  if (CAMPAIGN_KEYWORDS.some(keyword => lowerQuery.includes(keyword))) {
     const aggregated = aggregateByDimension(data, 'campaign')
     const analysis = createAnalysisItems(aggregated)
     
@@ -595,15 +666,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
   // ============================================================================
   
   // Audience-specific queries
-  const audienceKeywords = [
-    'audience', 'audiences', 'audience performance', 'audience breakdown',
-    'audience segments', 'audience targeting', 'audience insights',
-    'segments', 'targeting', 'audience recommendations',
-    'audience segments performed best', 'audience targeting worked best',
-    'audience segments', 'audience targeting'
-  ]
-  
-  if (audienceKeywords.some(keyword => lowerQuery.includes(keyword))) {
+  if (AUDIENCE_KEYWORDS.some(keyword => lowerQuery.includes(keyword))) {
     const aggregated = aggregateByDimension(data, 'audience')
     const analysis = createAnalysisItems(aggregated)
     
@@ -642,23 +705,9 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
   // ============================================================================
   
   // Creative-specific queries
-  const creativeKeywords = [
-    'creative', 'creatives', 'creative performance', 'creative formats',
-    'creative elements', 'creative optimization', 'creative recommendations',
-    'creative by platform', 'creative breakdown', 'creative insights',
-    'creative formats worked best', 'creative elements drove', 'creative recommendations do you have',
-    'creative formats', 'creative elements', 'creative recommendations'
-  ]
-  
-  if (creativeKeywords.some(keyword => lowerQuery.includes(keyword))) {
+  if (CREATIVE_KEYWORDS.some(keyword => lowerQuery.includes(keyword))) {
     // Calculate overall creative metrics
-    const totalMetrics = data.reduce((acc, row) => ({
-      spend: acc.spend + row.metrics.spend,
-      revenue: acc.revenue + row.metrics.revenue,
-      impressions: acc.impressions + row.metrics.impressions,
-      clicks: acc.clicks + row.metrics.clicks,
-      conversions: acc.conversions + row.metrics.conversions
-    }), { spend: 0, revenue: 0, impressions: 0, clicks: 0, conversions: 0 })
+    const totalMetrics = sumMetrics(data)
     
     const metrics = calculateMetrics(totalMetrics)
     
@@ -689,16 +738,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
   // ============================================================================
   
   // Optimization-specific queries
-  const optimizationKeywords = [
-    'optimize', 'optimization', 'opportunities', 'recommendations',
-    'where should we put more money', 'focus on improving', 'biggest opportunities',
-    'what should we optimize', 'optimization opportunities', 'strategic recommendations',
-    'what are our opportunities', 'how can we improve performance', 'what optimization opportunities exist',
-    'what should i focus on improving', 'what are the biggest opportunities', 'improve', 'improvement',
-    'opportunities', 'biggest opportunities', 'focus on improving', 'improve performance', 'put more money'
-  ]
-  
-  if (optimizationKeywords.some(keyword => lowerQuery.includes(keyword))) {
+  if (OPTIMIZATION_KEYWORDS.some(keyword => lowerQuery.includes(keyword))) {
     const platformAggregated = aggregateByDimension(data, 'platform')
     const platformAnalysis = createAnalysisItems(platformAggregated)
     
@@ -734,8 +774,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
   
   // CPA queries
   if (lowerQuery.includes('cpa') || lowerQuery.includes('cost per acquisition')) {
-    const totalSpend = data.reduce((sum, row) => sum + row.metrics.spend, 0)
-    const totalConversions = data.reduce((sum, row) => sum + row.metrics.conversions, 0)
+    const { spend: totalSpend, conversions: totalConversions } = sumMetrics(data)
     const cpa = totalConversions > 0 ? totalSpend / totalConversions : 0
     
     const content = `💸 Overall CPA: ${formatCurrency(cpa)}\n` +
@@ -753,8 +792,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
 
   // CPC queries
   if (lowerQuery.includes('cpc') || lowerQuery.includes('cost per click')) {
-    const totalSpend = data.reduce((sum, row) => sum + row.metrics.spend, 0)
-    const totalClicks = data.reduce((sum, row) => sum + row.metrics.clicks, 0)
+    const { spend: totalSpend, clicks: totalClicks } = sumMetrics(data)
     const cpc = totalClicks > 0 ? totalSpend / totalClicks : 0
     
     const content = `🖱️ Overall CPC: ${formatCurrency(cpc)}\n` +
@@ -772,8 +810,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
 
   // ROI queries
   if (lowerQuery.includes('roi') || lowerQuery.includes('return on investment')) {
-    const totalSpend = data.reduce((sum, row) => sum + row.metrics.spend, 0)
-    const totalRevenue = data.reduce((sum, row) => sum + row.metrics.revenue, 0)
+    const { spend: totalSpend, revenue: totalRevenue } = sumMetrics(data)
     const roi = totalSpend > 0 ? ((totalRevenue - totalSpend) / totalSpend) * 100 : 0
     const profitMargin = totalRevenue > 0 ? ((totalRevenue - totalSpend) / totalRevenue) * 100 : 0
     
@@ -793,8 +830,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
 
   // CTR queries
   if (lowerQuery.includes('ctr') || lowerQuery.includes('click-through rate') || lowerQuery.includes('click through rate')) {
-    const totalImpressions = data.reduce((sum, row) => sum + row.metrics.impressions, 0)
-    const totalClicks = data.reduce((sum, row) => sum + row.metrics.clicks, 0)
+    const { impressions: totalImpressions, clicks: totalClicks } = sumMetrics(data)
     const ctr = totalImpressions > 0 ? totalClicks / totalImpressions : 0
     
     const content = `🖱️ Overall CTR: ${formatPercentage(ctr)}\n` +
@@ -812,8 +848,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
 
   // SPEND HANDLER (HIGH PRIORITY)
   if (lowerQuery.includes('spend') || lowerQuery.includes('how much did we spend') || lowerQuery.includes('total spend')) {
-    const totalSpend = data.reduce((sum, row) => sum + row.metrics.spend, 0)
-    const totalRevenue = data.reduce((sum, row) => sum + row.metrics.revenue, 0)
+    const { spend: totalSpend, revenue: totalRevenue } = sumMetrics(data)
     const roas = totalSpend > 0 ? totalRevenue / totalSpend : 0
     
     const content = `💰 Total Spend: $${totalSpend.toLocaleString()}\n` +
@@ -835,8 +870,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
 
   // REVENUE HANDLER (HIGH PRIORITY)
   if (lowerQuery.includes('revenue') || lowerQuery.includes('how much revenue') || lowerQuery.includes('total revenue')) {
-    const totalSpend = data.reduce((sum, row) => sum + row.metrics.spend, 0)
-    const totalRevenue = data.reduce((sum, row) => sum + row.metrics.revenue, 0)
+    const { spend: totalSpend, revenue: totalRevenue } = sumMetrics(data)
     const roas = totalSpend > 0 ? totalRevenue / totalSpend : 0
     
     const content = `💵 Total Revenue: $${totalRevenue.toLocaleString()}\n` +
@@ -863,20 +897,9 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
     lowerQuery.includes('efficient') || lowerQuery.includes('pause')
   )) {
     // Analyze all campaigns
-    const campaignMetrics = data.reduce((acc, row) => {
-      const campaign = row.dimensions.campaign
-      if (!acc[campaign]) {
-        acc[campaign] = { spend: 0, revenue: 0, impressions: 0, clicks: 0, conversions: 0 }
-      }
-      acc[campaign].spend += row.metrics.spend
-      acc[campaign].revenue += row.metrics.revenue
-      acc[campaign].impressions += row.metrics.impressions
-      acc[campaign].clicks += row.metrics.clicks
-      acc[campaign].conversions += row.metrics.conversions
-      return acc
-    }, {} as any)
+    const campaignMetrics = aggregateByDimension(data, 'campaign')
     
-    const campaignAnalysis = Object.entries(campaignMetrics)
+    const campaignAnalysis = Array.from(campaignMetrics.entries())
       .map(([campaign, metrics]: [string, any]) => {
         const roas = metrics.spend > 0 ? metrics.revenue / metrics.spend : 0
         const ctr = metrics.impressions > 0 ? metrics.clicks / metrics.impressions : 0
@@ -936,8 +959,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
 
   // FINANCIAL METRICS HANDLERS (HIGH PRIORITY)
   if (lowerQuery.includes('cost per click') || lowerQuery.includes('cpc')) {
-    const totalSpend = data.reduce((sum, row) => sum + row.metrics.spend, 0)
-    const totalClicks = data.reduce((sum, row) => sum + row.metrics.clicks, 0)
+    const { spend: totalSpend, clicks: totalClicks } = sumMetrics(data)
     const cpc = totalClicks > 0 ? totalSpend / totalClicks : 0
     
     const content = `🖱️ Overall CPC: $${cpc.toFixed(2)}\n` +
@@ -958,8 +980,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
   }
 
   if (lowerQuery.includes('cpm') || lowerQuery.includes('cost per thousand')) {
-    const totalSpend = data.reduce((sum, row) => sum + row.metrics.spend, 0)
-    const totalImpressions = data.reduce((sum, row) => sum + row.metrics.impressions, 0)
+    const { spend: totalSpend, impressions: totalImpressions } = sumMetrics(data)
     const cpm = totalImpressions > 0 ? (totalSpend / totalImpressions) * 1000 : 0
     
     const content = `👁️ Overall CPM: $${cpm.toFixed(2)}\n` +
@@ -980,8 +1001,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
   }
 
   if (lowerQuery.includes('return on investment') || lowerQuery.includes('roi') || lowerQuery.includes('profit margin') || lowerQuery.includes('profitable')) {
-    const totalSpend = data.reduce((sum, row) => sum + row.metrics.spend, 0)
-    const totalRevenue = data.reduce((sum, row) => sum + row.metrics.revenue, 0)
+    const { spend: totalSpend, revenue: totalRevenue } = sumMetrics(data)
     const roi = totalSpend > 0 ? ((totalRevenue - totalSpend) / totalSpend) * 100 : 0
     const profitMargin = totalRevenue > 0 ? ((totalRevenue - totalSpend) / totalRevenue) * 100 : 0
     
@@ -1005,8 +1025,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
 
   // CTR HANDLER (HIGH PRIORITY)
   if (lowerQuery.includes('click-through rate') || lowerQuery.includes('ctr')) {
-    const totalImpressions = data.reduce((sum, row) => sum + row.metrics.impressions, 0)
-    const totalClicks = data.reduce((sum, row) => sum + row.metrics.clicks, 0)
+    const { impressions: totalImpressions, clicks: totalClicks } = sumMetrics(data)
     const ctr = totalImpressions > 0 ? totalClicks / totalImpressions : 0
     
     const content = `🖱️ Overall CTR: ${(ctr * 100).toFixed(2)}%\n` +
@@ -1028,9 +1047,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
 
   // CONVERSIONS HANDLER (HIGH PRIORITY)
   if (lowerQuery.includes('conversions') || lowerQuery.includes('how many conversions')) {
-    const totalConversions = data.reduce((sum, row) => sum + row.metrics.conversions, 0)
-    const totalSpend = data.reduce((sum, row) => sum + row.metrics.spend, 0)
-    const totalRevenue = data.reduce((sum, row) => sum + row.metrics.revenue, 0)
+    const { conversions: totalConversions, spend: totalSpend, revenue: totalRevenue } = sumMetrics(data)
     const cpa = totalConversions > 0 ? totalSpend / totalConversions : 0
     
     const content = `🎯 Total Conversions: ${totalConversions.toLocaleString()}\n` +
@@ -1053,8 +1070,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
 
   // CONVERSION RATE HANDLER (HIGH PRIORITY)
   if (lowerQuery.includes('conversion rate')) {
-    const totalConversions = data.reduce((sum, row) => sum + row.metrics.conversions, 0)
-    const totalClicks = data.reduce((sum, row) => sum + row.metrics.clicks, 0)
+    const { conversions: totalConversions, clicks: totalClicks } = sumMetrics(data)
     const conversionRate = totalClicks > 0 ? totalConversions / totalClicks : 0
     
     const content = `📈 CONVERSION RATE:\n\n` +
@@ -1077,20 +1093,9 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
 
   // AUDIENCE PERFORMANCE HANDLER (HIGH PRIORITY)
   if (lowerQuery.includes('audience performance') || lowerQuery.includes('audience')) {
-    const audienceMetrics = data.reduce((acc, row) => {
-      const audience = row.dimensions.audience
-      if (!acc[audience]) {
-        acc[audience] = { spend: 0, revenue: 0, impressions: 0, clicks: 0, conversions: 0 }
-      }
-      acc[audience].spend += row.metrics.spend
-      acc[audience].revenue += row.metrics.revenue
-      acc[audience].impressions += row.metrics.impressions
-      acc[audience].clicks += row.metrics.clicks
-      acc[audience].conversions += row.metrics.conversions
-      return acc
-    }, {} as any)
+    const audienceMetrics = aggregateByDimension(data, 'audience')
     
-    const audienceAnalysis = Object.entries(audienceMetrics)
+    const audienceAnalysis = Array.from(audienceMetrics.entries())
       .map(([audience, metrics]: [string, any]) => {
         const roas = metrics.spend > 0 ? metrics.revenue / metrics.spend : 0
         const ctr = metrics.impressions > 0 ? metrics.clicks / metrics.impressions : 0
@@ -1130,11 +1135,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
   // EXECUTIVE SUMMARY ALTERNATIVE HANDLERS (HIGH PRIORITY)
   if (lowerQuery.includes('how are we doing overall') || lowerQuery.includes('big picture') || lowerQuery.includes('high-level overview')) {
     // Use the same logic as executive summary but with different triggers
-    const totalSpend = data.reduce((sum, row) => sum + row.metrics.spend, 0)
-    const totalRevenue = data.reduce((sum, row) => sum + row.metrics.revenue, 0)
-    const totalImpressions = data.reduce((sum, row) => sum + row.metrics.impressions, 0)
-    const totalClicks = data.reduce((sum, row) => sum + row.metrics.clicks, 0)
-    const totalConversions = data.reduce((sum, row) => sum + row.metrics.conversions, 0)
+    const { spend: totalSpend, revenue: totalRevenue, impressions: totalImpressions, clicks: totalClicks, conversions: totalConversions } = sumMetrics(data)
     
     const roas = totalSpend > 0 ? totalRevenue / totalSpend : 0
     const ctr = totalImpressions > 0 ? totalClicks / totalImpressions : 0
@@ -1163,11 +1164,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
 
   // FINANCIAL PERFORMANCE HANDLER (HIGH PRIORITY)
   if (lowerQuery.includes('financial performance') || lowerQuery.includes('show me our financial')) {
-    const totalSpend = data.reduce((sum, row) => sum + row.metrics.spend, 0)
-    const totalRevenue = data.reduce((sum, row) => sum + row.metrics.revenue, 0)
-    const totalConversions = data.reduce((sum, row) => sum + row.metrics.conversions, 0)
-    const totalClicks = data.reduce((sum, row) => sum + row.metrics.clicks, 0)
-    const totalImpressions = data.reduce((sum, row) => sum + row.metrics.impressions, 0)
+    const { spend: totalSpend, revenue: totalRevenue, conversions: totalConversions, clicks: totalClicks, impressions: totalImpressions } = sumMetrics(data)
     
     const roas = totalSpend > 0 ? totalRevenue / totalSpend : 0
     const cpa = totalConversions > 0 ? totalSpend / totalConversions : 0
@@ -1204,11 +1201,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
     const cm360Data = data.filter(row => row.dimensions.platform === 'CM360')
     
     if (cm360Data.length > 0) {
-      const totalSpend = cm360Data.reduce((sum, row) => sum + row.metrics.spend, 0)
-      const totalRevenue = cm360Data.reduce((sum, row) => sum + row.metrics.revenue, 0)
-      const totalImpressions = cm360Data.reduce((sum, row) => sum + row.metrics.impressions, 0)
-      const totalClicks = cm360Data.reduce((sum, row) => sum + row.metrics.clicks, 0)
-      const totalConversions = cm360Data.reduce((sum, row) => sum + row.metrics.conversions, 0)
+      const { spend: totalSpend, revenue: totalRevenue, impressions: totalImpressions, clicks: totalClicks, conversions: totalConversions } = sumMetrics(cm360Data)
       
       const roas = totalSpend > 0 ? totalRevenue / totalSpend : 0
       const ctr = totalImpressions > 0 ? totalClicks / totalImpressions : 0
@@ -1241,20 +1234,9 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
 
   if (lowerQuery.includes('platform should i focus on') || lowerQuery.includes('platform comparison') || lowerQuery.includes('show me platform comparison')) {
     // Use the same logic as platform comparison
-    const platformMetrics = data.reduce((acc, row) => {
-      const platform = row.dimensions.platform
-      if (!acc[platform]) {
-        acc[platform] = { spend: 0, revenue: 0, impressions: 0, clicks: 0, conversions: 0 }
-      }
-      acc[platform].spend += row.metrics.spend
-      acc[platform].revenue += row.metrics.revenue
-      acc[platform].impressions += row.metrics.impressions
-      acc[platform].clicks += row.metrics.clicks
-      acc[platform].conversions += row.metrics.conversions
-      return acc
-    }, {} as any)
+    const platformMetrics = aggregateByDimension(data, 'platform')
     
-    const platformAnalysis = Object.entries(platformMetrics)
+    const platformAnalysis = Array.from(platformMetrics.entries())
       .map(([platform, metrics]: [string, any]) => {
         const roas = metrics.spend > 0 ? metrics.revenue / metrics.spend : 0
         const ctr = metrics.impressions > 0 ? metrics.clicks / metrics.impressions : 0
@@ -1295,20 +1277,9 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
   // CAMPAIGN ALTERNATIVE HANDLERS (HIGH PRIORITY)
   if (lowerQuery.includes('campaigns are doing well') || lowerQuery.includes('campaigns performing') || lowerQuery.includes('performance of each campaign')) {
     // Use the same logic as campaign analysis
-    const campaignMetrics = data.reduce((acc, row) => {
-      const campaign = row.dimensions.campaign
-      if (!acc[campaign]) {
-        acc[campaign] = { spend: 0, revenue: 0, impressions: 0, clicks: 0, conversions: 0 }
-      }
-      acc[campaign].spend += row.metrics.spend
-      acc[campaign].revenue += row.metrics.revenue
-      acc[campaign].impressions += row.metrics.impressions
-      acc[campaign].clicks += row.metrics.clicks
-      acc[campaign].conversions += row.metrics.conversions
-      return acc
-    }, {} as any)
+    const campaignMetrics = aggregateByDimension(data, 'campaign')
     
-    const campaignAnalysis = Object.entries(campaignMetrics)
+    const campaignAnalysis = Array.from(campaignMetrics.entries())
       .map(([campaign, metrics]: [string, any]) => {
         const roas = metrics.spend > 0 ? metrics.revenue / metrics.spend : 0
         const ctr = metrics.impressions > 0 ? metrics.clicks / metrics.impressions : 0
@@ -1346,11 +1317,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
 
   // CREATIVE PERFORMANCE HANDLER (HIGH PRIORITY)
   if (lowerQuery.includes('creative') || lowerQuery.includes('creatives')) {
-    const totalImpressions = data.reduce((sum, row) => sum + row.metrics.impressions, 0)
-    const totalClicks = data.reduce((sum, row) => sum + row.metrics.clicks, 0)
-    const totalConversions = data.reduce((sum, row) => sum + row.metrics.conversions, 0)
-    const totalSpend = data.reduce((sum, row) => sum + row.metrics.spend, 0)
-    const totalRevenue = data.reduce((sum, row) => sum + row.metrics.revenue, 0)
+    const { impressions: totalImpressions, clicks: totalClicks, conversions: totalConversions, spend: totalSpend, revenue: totalRevenue } = sumMetrics(data)
     
     const ctr = totalImpressions > 0 ? totalClicks / totalImpressions : 0
     const roas = totalSpend > 0 ? totalRevenue / totalSpend : 0
@@ -1389,20 +1356,9 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
       lowerQuery.includes('where should we put more money') || lowerQuery.includes('focus on improving')) {
     
     // Analyze platform performance for opportunities
-    const platformMetrics = data.reduce((acc, row) => {
-      const platform = row.dimensions.platform
-      if (!acc[platform]) {
-        acc[platform] = { spend: 0, revenue: 0, impressions: 0, clicks: 0, conversions: 0 }
-      }
-      acc[platform].spend += row.metrics.spend
-      acc[platform].revenue += row.metrics.revenue
-      acc[platform].impressions += row.metrics.impressions
-      acc[platform].clicks += row.metrics.clicks
-      acc[platform].conversions += row.metrics.conversions
-      return acc
-    }, {} as any)
+    const platformMetrics = aggregateByDimension(data, 'platform')
     
-    const platformAnalysis = Object.entries(platformMetrics)
+    const platformAnalysis = Array.from(platformMetrics.entries())
       .map(([platform, metrics]: [string, any]) => {
         const roas = metrics.spend > 0 ? metrics.revenue / metrics.spend : 0
         const ctr = metrics.impressions > 0 ? metrics.clicks / metrics.impressions : 0
@@ -1444,8 +1400,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
   // SPEND & FINANCIAL METRICS HANDLERS
   if (lowerQuery.includes('spend') || lowerQuery.includes('roas') || lowerQuery.includes('cpm') || lowerQuery.includes('cpc')) {
     if (lowerQuery.includes('spend') && (lowerQuery.includes('achieve') || lowerQuery.includes('numbers') || lowerQuery.includes('total'))) {
-      const totalSpend = data.reduce((sum, row) => sum + row.metrics.spend, 0)
-      const totalRevenue = data.reduce((sum, row) => sum + row.metrics.revenue, 0)
+      const { spend: totalSpend, revenue: totalRevenue } = sumMetrics(data)
       const roas = totalSpend > 0 ? totalRevenue / totalSpend : 0
       
       const content = `💰 Total Spend: $${totalSpend.toLocaleString()}\n` +
@@ -1466,8 +1421,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
     }
     
     if (lowerQuery.includes('roas') || lowerQuery.includes('return on ad spend')) {
-      const totalSpend = data.reduce((sum, row) => sum + row.metrics.spend, 0)
-      const totalRevenue = data.reduce((sum, row) => sum + row.metrics.revenue, 0)
+      const { spend: totalSpend, revenue: totalRevenue } = sumMetrics(data)
       const roas = totalSpend > 0 ? totalRevenue / totalSpend : 0
       
       const content = `💎 Overall ROAS: ${roas.toFixed(2)}x\n` +
@@ -1490,18 +1444,12 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
 
   // CAMPAIGN PERFORMANCE HANDLERS
   if (lowerQuery.includes('campaign') && lowerQuery.includes('performance')) {
-    const campaigns = ['FreshNest Summer Grilling', 'FreshNest Back to School', 'FreshNest Holiday Recipes', 'FreshNest Pantry Staples']
-    
-    for (const campaign of campaigns) {
+    for (const campaign of PERFORMANCE_CAMPAIGNS) {
       if (lowerQuery.includes(campaign.toLowerCase())) {
         const campaignData = data.filter(row => row.dimensions.campaign === campaign)
         
         if (campaignData.length > 0) {
-          const totalSpend = campaignData.reduce((sum, row) => sum + row.metrics.spend, 0)
-          const totalRevenue = campaignData.reduce((sum, row) => sum + row.metrics.revenue, 0)
-          const totalImpressions = campaignData.reduce((sum, row) => sum + row.metrics.impressions, 0)
-          const totalClicks = campaignData.reduce((sum, row) => sum + row.metrics.clicks, 0)
-          const totalConversions = campaignData.reduce((sum, row) => sum + row.metrics.conversions, 0)
+          const { spend: totalSpend, revenue: totalRevenue, impressions: totalImpressions, clicks: totalClicks, conversions: totalConversions } = sumMetrics(campaignData)
           
           const ctr = totalImpressions > 0 ? totalClicks / totalImpressions : 0
           const roas = totalSpend > 0 ? totalRevenue / totalSpend : 0
@@ -1548,11 +1496,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
     const campaignData = data.filter(row => row.dimensions.campaign === 'FreshNest Summer Grilling')
     
     if (campaignData.length > 0) {
-      const totalSpend = campaignData.reduce((sum, row) => sum + row.metrics.spend, 0)
-      const totalRevenue = campaignData.reduce((sum, row) => sum + row.metrics.revenue, 0)
-      const totalImpressions = campaignData.reduce((sum, row) => sum + row.metrics.impressions, 0)
-      const totalClicks = campaignData.reduce((sum, row) => sum + row.metrics.clicks, 0)
-      const totalConversions = campaignData.reduce((sum, row) => sum + row.metrics.conversions, 0)
+      const { spend: totalSpend, revenue: totalRevenue, impressions: totalImpressions, clicks: totalClicks, conversions: totalConversions } = sumMetrics(campaignData)
       
       const roas = totalSpend > 0 ? totalRevenue / totalSpend : 0
       const ctr = totalImpressions > 0 ? totalClicks / totalImpressions : 0
@@ -1599,31 +1543,16 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
     const dateRange = `${startDate.toLocaleDateString('en-US', { month: 'long', year: 'numeric' })} - ${endDate.toLocaleDateString('en-US', { month: 'long', year: 'numeric' })}`
     
     // Core metrics calculation
-    const totalSpend = data.reduce((sum, row) => sum + row.metrics.spend, 0)
-    const totalRevenue = data.reduce((sum, row) => sum + row.metrics.revenue, 0)
-    const totalImpressions = data.reduce((sum, row) => sum + row.metrics.impressions, 0)
-    const totalClicks = data.reduce((sum, row) => sum + row.metrics.clicks, 0)
-    const totalConversions = data.reduce((sum, row) => sum + row.metrics.conversions, 0)
+    const { spend: totalSpend, revenue: totalRevenue, impressions: totalImpressions, clicks: totalClicks, conversions: totalConversions } = sumMetrics(data)
     
     const roas = totalSpend > 0 ? totalRevenue / totalSpend : 0
     const ctr = totalImpressions > 0 ? totalClicks / totalImpressions : 0
     const cpa = totalConversions > 0 ? totalSpend / totalConversions : 0
     
     // Platform breakdown
-    const platformMetrics = data.reduce((acc, row) => {
-      const platform = row.dimensions.platform
-      if (!acc[platform]) {
-        acc[platform] = { spend: 0, revenue: 0, impressions: 0, clicks: 0, conversions: 0 }
-      }
-      acc[platform].spend += row.metrics.spend
-      acc[platform].revenue += row.metrics.revenue
-      acc[platform].impressions += row.metrics.impressions
-      acc[platform].clicks += row.metrics.clicks
-      acc[platform].conversions += row.metrics.conversions
-      return acc
-    }, {} as any)
+    const platformMetrics = aggregateByDimension(data, 'platform')
     
-    const platformAnalysis = Object.entries(platformMetrics)
+    const platformAnalysis = Array.from(platformMetrics.entries())
       .map(([platform, metrics]: [string, any]) => {
         const platformRoas = metrics.spend > 0 ? metrics.revenue / metrics.spend : 0
         const platformCtr = metrics.impressions > 0 ? metrics.clicks / metrics.impressions : 0
@@ -1635,20 +1564,9 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
     const bottomPlatform = platformAnalysis[platformAnalysis.length - 1]
     
     // Campaign breakdown
-    const campaignMetrics = data.reduce((acc, row) => {
-      const campaign = row.dimensions.campaign
-      if (!acc[campaign]) {
-        acc[campaign] = { spend: 0, revenue: 0, impressions: 0, clicks: 0, conversions: 0 }
-      }
-      acc[campaign].spend += row.metrics.spend
-      acc[campaign].revenue += row.metrics.revenue
-      acc[campaign].impressions += row.metrics.impressions
-      acc[campaign].clicks += row.metrics.clicks
-      acc[campaign].conversions += row.metrics.conversions
-      return acc
-    }, {} as any)
+    const campaignMetrics = aggregateByDimension(data, 'campaign')
     
-    const campaignAnalysis = Object.entries(campaignMetrics)
+    const campaignAnalysis = Array.from(campaignMetrics.entries())
       .map(([campaign, metrics]: [string, any]) => {
         const campaignRoas = metrics.spend > 0 ? metrics.revenue / metrics.spend : 0
         const campaignCtr = metrics.impressions > 0 ? metrics.clicks / metrics.impressions : 0
@@ -1731,20 +1649,9 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
     
     // Platform comparison
     if (lowerQuery.includes('platform')) {
-      const platformMetrics = data.reduce((acc, row) => {
-        const platform = row.dimensions.platform
-        if (!acc[platform]) {
-          acc[platform] = { spend: 0, revenue: 0, impressions: 0, clicks: 0, conversions: 0 }
-        }
-        acc[platform].spend += row.metrics.spend
-        acc[platform].revenue += row.metrics.revenue
-        acc[platform].impressions += row.metrics.impressions
-        acc[platform].clicks += row.metrics.clicks
-        acc[platform].conversions += row.metrics.conversions
-        return acc
-      }, {} as any)
+      const platformMetrics = aggregateByDimension(data, 'platform')
       
-      const platformComparison = Object.entries(platformMetrics)
+      const platformComparison = Array.from(platformMetrics.entries())
         .map(([platform, metrics]: [string, any]) => {
           const roas = metrics.spend > 0 ? metrics.revenue / metrics.spend : 0
           const ctr = metrics.impressions > 0 ? metrics.clicks / metrics.impressions : 0
@@ -1776,20 +1683,9 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
     
     // Campaign comparison
     if (lowerQuery.includes('campaign')) {
-      const campaignMetrics = data.reduce((acc, row) => {
-        const campaign = row.dimensions.campaign
-        if (!acc[campaign]) {
-          acc[campaign] = { spend: 0, revenue: 0, impressions: 0, clicks: 0, conversions: 0 }
-        }
-        acc[campaign].spend += row.metrics.spend
-        acc[campaign].revenue += row.metrics.revenue
-        acc[campaign].impressions += row.metrics.impressions
-        acc[campaign].clicks += row.metrics.clicks
-        acc[campaign].conversions += row.metrics.conversions
-        return acc
-      }, {} as any)
+      const campaignMetrics = aggregateByDimension(data, 'campaign')
       
-      const campaignComparison = Object.entries(campaignMetrics)
+      const campaignComparison = Array.from(campaignMetrics.entries())
         .map(([campaign, metrics]: [string, any]) => {
           const roas = metrics.spend > 0 ? metrics.revenue / metrics.spend : 0
           const ctr = metrics.impressions > 0 ? metrics.clicks / metrics.impressions : 0
@@ -1824,9 +1720,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
   if (lowerQuery.includes('impressions') || lowerQuery.includes('clicks') || lowerQuery.includes('conversions') || 
       lowerQuery.includes('ctr') || lowerQuery.includes('click-through rate')) {
     
-    const totalImpressions = data.reduce((sum, row) => sum + row.metrics.impressions, 0)
-    const totalClicks = data.reduce((sum, row) => sum + row.metrics.clicks, 0)
-    const totalConversions = data.reduce((sum, row) => sum + row.metrics.conversions, 0)
+    const { impressions: totalImpressions, clicks: totalClicks, conversions: totalConversions } = sumMetrics(data)
     const ctr = totalImpressions > 0 ? totalClicks / totalImpressions : 0
     
     const content = `📊 ENGAGEMENT METRICS:\n\n` +
@@ -1881,11 +1775,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
       })
       
       if (weekData.length > 0) {
-        const totalSpend = weekData.reduce((sum, row) => sum + row.metrics.spend, 0)
-        const totalRevenue = weekData.reduce((sum, row) => sum + row.metrics.revenue, 0)
-        const totalImpressions = weekData.reduce((sum, row) => sum + row.metrics.impressions, 0)
-        const totalClicks = weekData.reduce((sum, row) => sum + row.metrics.clicks, 0)
-        const totalConversions = weekData.reduce((sum, row) => sum + row.metrics.conversions, 0)
+        const { spend: totalSpend, revenue: totalRevenue, impressions: totalImpressions, clicks: totalClicks, conversions: totalConversions } = sumMetrics(weekData)
         
         const roas = totalSpend > 0 ? totalRevenue / totalSpend : 0
         const ctr = totalImpressions > 0 ? totalClicks / totalImpressions : 0
@@ -1940,8 +1830,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
           return rowDate >= startDate && rowDate <= endDate
         })
         
-        const totalSpend = weekData.reduce((sum, row) => sum + row.metrics.spend, 0)
-        const totalRevenue = weekData.reduce((sum, row) => sum + row.metrics.revenue, 0)
+        const { spend: totalSpend, revenue: totalRevenue } = sumMetrics(weekData)
         const roas = totalSpend > 0 ? totalRevenue / totalSpend : 0
         
         weeklyData[week] = { spend: totalSpend, revenue: totalRevenue, roas, dataPoints: weekData.length }
@@ -1980,20 +1869,9 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
   if (lowerQuery.includes('optimize') || lowerQuery.includes('improve') || lowerQuery.includes('recommendations') ||
       lowerQuery.includes('insights') || lowerQuery.includes('trends') || lowerQuery.includes('patterns')) {
     
-    const platformMetrics = data.reduce((acc, row) => {
-      const platform = row.dimensions.platform
-      if (!acc[platform]) {
-        acc[platform] = { spend: 0, revenue: 0, impressions: 0, clicks: 0, conversions: 0 }
-      }
-      acc[platform].spend += row.metrics.spend
-      acc[platform].revenue += row.metrics.revenue
-      acc[platform].impressions += row.metrics.impressions
-      acc[platform].clicks += row.metrics.clicks
-      acc[platform].conversions += row.metrics.conversions
-      return acc
-    }, {} as any)
+    const platformMetrics = aggregateByDimension(data, 'platform')
     
-    const platformAnalysis = Object.entries(platformMetrics)
+    const platformAnalysis = Array.from(platformMetrics.entries())
       .map(([platform, metrics]: [string, any]) => {
         const roas = metrics.spend > 0 ? metrics.revenue / metrics.spend : 0
         const ctr = metrics.impressions > 0 ? metrics.clicks / metrics.impressions : 0
@@ -2036,20 +1914,9 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
 
   // CREATIVE OPTIMIZATION HANDLER (HIGH PRIORITY)
   if (lowerQuery.includes('creative optimization') || lowerQuery.includes('creative optimizations')) {
-    const creativeMetrics = data.reduce((acc, row) => {
-      const format = row.dimensions.creative_format
-      if (!acc[format]) {
-        acc[format] = { spend: 0, revenue: 0, impressions: 0, clicks: 0, conversions: 0 }
-      }
-      acc[format].spend += row.metrics.spend
-      acc[format].revenue += row.metrics.revenue
-      acc[format].impressions += row.metrics.impressions
-      acc[format].clicks += row.metrics.clicks
-      acc[format].conversions += row.metrics.conversions
-      return acc
-    }, {} as any)
+    const creativeMetrics = aggregateByDimension(data, 'creative_format')
     
-    const creativeAnalysis = Object.entries(creativeMetrics)
+    const creativeAnalysis = Array.from(creativeMetrics.entries())
       .map(([format, metrics]: [string, any]) => {
         const roas = metrics.spend > 0 ? metrics.revenue / metrics.spend : 0
         const ctr = metrics.impressions > 0 ? metrics.clicks / metrics.impressions : 0
@@ -2092,20 +1959,9 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
 
   // CREATIVE CONVERSION ELEMENTS HANDLER (HIGH PRIORITY)
   if (lowerQuery.includes('creative elements') || lowerQuery.includes('drove the most conversions')) {
-    const creativeMetrics = data.reduce((acc, row) => {
-      const format = row.dimensions.creative_format
-      if (!acc[format]) {
-        acc[format] = { spend: 0, revenue: 0, impressions: 0, clicks: 0, conversions: 0 }
-      }
-      acc[format].spend += row.metrics.spend
-      acc[format].revenue += row.metrics.revenue
-      acc[format].impressions += row.metrics.impressions
-      acc[format].clicks += row.metrics.clicks
-      acc[format].conversions += row.metrics.conversions
-      return acc
-    }, {} as any)
+    const creativeMetrics = aggregateByDimension(data, 'creative_format')
     
-    const conversionAnalysis = Object.entries(creativeMetrics)
+    const conversionAnalysis = Array.from(creativeMetrics.entries())
       .map(([format, metrics]: [string, any]) => {
         const roas = metrics.spend > 0 ? metrics.revenue / metrics.spend : 0
         const ctr = metrics.impressions > 0 ? metrics.clicks / metrics.impressions : 0
@@ -2204,20 +2060,9 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
 
   // CREATIVE RECOMMENDATIONS HANDLER (HIGH PRIORITY)
   if (lowerQuery.includes('creative recommendations')) {
-    const creativeMetrics = data.reduce((acc, row) => {
-      const format = row.dimensions.creative_format
-      if (!acc[format]) {
-        acc[format] = { spend: 0, revenue: 0, impressions: 0, clicks: 0, conversions: 0 }
-      }
-      acc[format].spend += row.metrics.spend
-      acc[format].revenue += row.metrics.revenue
-      acc[format].impressions += row.metrics.impressions
-      acc[format].clicks += row.metrics.clicks
-      acc[format].conversions += row.metrics.conversions
-      return acc
-    }, {} as any)
+    const creativeMetrics = aggregateByDimension(data, 'creative_format')
     
-    const creativeAnalysis = Object.entries(creativeMetrics)
+    const creativeAnalysis = Array.from(creativeMetrics.entries())
       .map(([format, metrics]: [string, any]) => {
         const roas = metrics.spend > 0 ? metrics.revenue / metrics.spend : 0
         const ctr = metrics.impressions > 0 ? metrics.clicks / metrics.impressions : 0
@@ -2257,20 +2102,9 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
 
   // AUDIENCE TARGETING HANDLER (HIGH PRIORITY)
   if (lowerQuery.includes('audience targeting') || lowerQuery.includes('targeting worked best')) {
-    const audienceMetrics = data.reduce((acc, row) => {
-      const audience = row.dimensions.audience
-      if (!acc[audience]) {
-        acc[audience] = { spend: 0, revenue: 0, impressions: 0, clicks: 0, conversions: 0 }
-      }
-      acc[audience].spend += row.metrics.spend
-      acc[audience].revenue += row.metrics.revenue
-      acc[audience].impressions += row.metrics.impressions
-      acc[audience].clicks += row.metrics.clicks
-      acc[audience].conversions += row.metrics.conversions
-      return acc
-    }, {} as any)
+    const audienceMetrics = aggregateByDimension(data, 'audience')
     
-    const audienceAnalysis = Object.entries(audienceMetrics)
+    const audienceAnalysis = Array.from(audienceMetrics.entries())
       .map(([audience, metrics]: [string, any]) => {
         const roas = metrics.spend > 0 ? metrics.revenue / metrics.spend : 0
         const ctr = metrics.impressions > 0 ? metrics.clicks / metrics.impressions : 0
@@ -2313,20 +2147,9 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
     
     // Creative format analysis
     if (lowerQuery.includes('creative')) {
-      const creativeMetrics = data.reduce((acc, row) => {
-        const format = row.dimensions.creative_format
-        if (!acc[format]) {
-          acc[format] = { spend: 0, revenue: 0, impressions: 0, clicks: 0, conversions: 0 }
-        }
-        acc[format].spend += row.metrics.spend
-        acc[format].revenue += row.metrics.revenue
-        acc[format].impressions += row.metrics.impressions
-        acc[format].clicks += row.metrics.clicks
-        acc[format].conversions += row.metrics.conversions
-        return acc
-      }, {} as any)
+      const creativeMetrics = aggregateByDimension(data, 'creative_format')
       
-      const creativeAnalysis = Object.entries(creativeMetrics)
+      const creativeAnalysis = Array.from(creativeMetrics.entries())
         .map(([format, metrics]: [string, any]) => {
           const roas = metrics.spend > 0 ? metrics.revenue / metrics.spend : 0
           const ctr = metrics.impressions > 0 ? metrics.clicks / metrics.impressions : 0
@@ -2354,20 +2177,9 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
     
     // Audience analysis
     if (lowerQuery.includes('audience')) {
-      const audienceMetrics = data.reduce((acc, row) => {
-        const audience = row.dimensions.audience
-        if (!acc[audience]) {
-          acc[audience] = { spend: 0, revenue: 0, impressions: 0, clicks: 0, conversions: 0 }
-        }
-        acc[audience].spend += row.metrics.spend
-        acc[audience].revenue += row.metrics.revenue
-        acc[audience].impressions += row.metrics.impressions
-        acc[audience].clicks += row.metrics.clicks
-        acc[audience].conversions += row.metrics.conversions
-        return acc
-      }, {} as any)
+      const audienceMetrics = aggregateByDimension(data, 'audience')
       
-      const audienceAnalysis = Object.entries(audienceMetrics)
+      const audienceAnalysis = Array.from(audienceMetrics.entries())
         .map(([audience, metrics]: [string, any]) => {
           const roas = metrics.spend > 0 ? metrics.revenue / metrics.spend : 0
           const ctr = metrics.impressions > 0 ? metrics.clicks / metrics.impressions : 0
@@ -2398,20 +2210,9 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
   if (lowerQuery.includes('anomaly') || lowerQuery.includes('issue') || lowerQuery.includes('problem') ||
       lowerQuery.includes('red flag') || lowerQuery.includes('concerning') || lowerQuery.includes('health')) {
     
-    const platformMetrics = data.reduce((acc, row) => {
-      const platform = row.dimensions.platform
-      if (!acc[platform]) {
-        acc[platform] = { spend: 0, revenue: 0, impressions: 0, clicks: 0, conversions: 0 }
-      }
-      acc[platform].spend += row.metrics.spend
-      acc[platform].revenue += row.metrics.revenue
-      acc[platform].impressions += row.metrics.impressions
-      acc[platform].clicks += row.metrics.clicks
-      acc[platform].conversions += row.metrics.conversions
-      return acc
-    }, {} as any)
+    const platformMetrics = aggregateByDimension(data, 'platform')
     
-    const platformAnalysis = Object.entries(platformMetrics)
+    const platformAnalysis = Array.from(platformMetrics.entries())
       .map(([platform, metrics]: [string, any]) => {
         const roas = metrics.spend > 0 ? metrics.revenue / metrics.spend : 0
         const ctr = metrics.impressions > 0 ? metrics.clicks / metrics.impressions : 0
@@ -2454,13 +2255,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
   // ============================================================================
   
   // Chart request queries
-  const chartRequestKeywords = [
-    'show me a graph', 'create a chart', 'visualize this data', 'put this in a chart',
-    'show me a bar chart', 'make this into a graph', 'chart this data', 'graph this',
-    'show me a chart', 'visualize', 'graph', 'chart', 'plot this data'
-  ]
-  
-  const isChartRequest = chartRequestKeywords.some(keyword => lowerQuery.includes(keyword))
+  const isChartRequest = CHART_REQUEST_KEYWORDS.some(keyword => lowerQuery.includes(keyword))
   
   if (isChartRequest) {
     // Get the previous response context to understand what data to chart
@@ -2568,11 +2363,7 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
           
         default:
           // Default to overall metrics
-          const totalSpend = data.reduce((sum, row) => sum + row.metrics.spend, 0)
-          const totalRevenue = data.reduce((sum, row) => sum + row.metrics.revenue, 0)
-          const totalImpressions = data.reduce((sum, row) => sum + row.metrics.impressions, 0)
-          const totalClicks = data.reduce((sum, row) => sum + row.metrics.clicks, 0)
-          const totalConversions = data.reduce((sum, row) => sum + row.metrics.conversions, 0)
+          const { spend: totalSpend, revenue: totalRevenue, impressions: totalImpressions, clicks: totalClicks, conversions: totalConversions } = sumMetrics(data)
           
           chartData = [
             { metric: 'Spend', value: totalSpend },
@@ -2635,7 +2426,46 @@ async function processAIQuery(query: string, data: any[], sessionId?: string) {
 
 export async function POST(request: NextRequest) {
   try {
-    const { query, sessionId } = await request.json()
+    const { query, queries, sessionId } = await request.json()
+    
+    // Batch form: answer several queries in one round trip, in order
+    if (queries !== undefined) {
+      if (!Array.isArray(queries) || queries.length === 0 || queries.some(q => !q || typeof q !== 'string')) {
+        return NextResponse.json(
+          { error: 'Queries must be a non-empty array of strings' },
+          { status: 400 }
+        )
+      }
+      
+      if (queries.length > MAX_BATCH_QUERIES) {
+        return NextResponse.json(
+          { error: `A batch can contain at most ${MAX_BATCH_QUERIES} queries` },
+          { status: 400 }
+        )
+      }
+      
+      const data = await loadCampaignData()
+      if (!data || data.length === 0) {
+        return NextResponse.json(
+          { error: 'No campaign data available' },
+          { status: 500 }
+        )
+      }
+      
+      // Processed sequentially so each query sees the session context left by the previous one.
+      // A failing query gets its own error entry instead of failing the whole batch.
+      const results = []
+      for (const batchQuery of queries) {
+        try {
+          results.push(await processAIQuery(batchQuery, data, sessionId))
+        } catch (error) {
+          console.error('Error processing AI query in batch:', error)
+          results.push({ error: 'Internal server error' })
+        }
+      }
+      
+      return NextResponse.json({ results })
+    }
     
     if (!query || typeof query !== 'string') {
       return NextResponse.json(
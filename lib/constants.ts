@@ -63,6 +63,9 @@ export const PLATFORM_MAP: PlatformMapping = {
 export const SESSION_TIMEOUT = 60 * 60 * 1000 // 1 hour
 export const MAX_MESSAGES = 10 // Keep only last 10 messages
 
+// Batch query limits
+export const MAX_BATCH_QUERIES = 50 // Queries accepted in one /api/ai/query call
+
 // Performance thresholds for anomaly detection
 export const ANOMALY_THRESHOLDS = {
   LOW_CTR: 0.5, // Below 0.5% CTR
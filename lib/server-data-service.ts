@@ -14,59 +14,113 @@ function extractBrandFromCampaign(campaignName: string): string {
   return 'FreshNest'
 }
 
+// Parsed rows from the last CSV load, reused until the file changes on disk
+let campaignDataCache: { path: string, mtimeMs: number, size: number, data: MarketingData[] } | null = null
+
 // Load CSV data from the backend
 export async function loadCampaignData(): Promise<MarketingData[]> {
   try {
     const csvPath = path.join(process.cwd(), 'sample-campaign-data.csv')
+    const { mtimeMs, size } = fs.statSync(csvPath)
+    if (campaignDataCache && campaignDataCache.path === csvPath &&
+        campaignDataCache.mtimeMs === mtimeMs && campaignDataCache.size === size) {
+      return campaignDataCache.data
+    }
+    
     const csvContent = fs.readFileSync(csvPath, 'utf-8')
     
-    const lines = csvContent.split('\n').filter(line => line.trim())
-    const headers = lines[0].split(',').map(h => h.trim().replace(/"/g, ''))
+    const lines = csvContent.split('\n')
+    const headerLine = lines.findIndex(line => line.trim())
+    const headers = lines[headerLine].split(',').map(h => h.trim().replace(/"/g, ''))
     
-    const data: MarketingData[] = lines.slice(1).map((line, index) => {
+    // Resolve each column's position once; a repeated header name keeps its last position
+    const column = (name: string) => headers.lastIndexOf(name)
+    const col = {
+      date: column('date'),
+      brand: column('brand'),
+      audience: column('audience'),
+      platform: column('platform'),
+      campaignId: column('campaign_id'),
+      campaignName: column('campaign_name'),
+      canonicalCampaign: column('canonical_campaign'),
+      adGroupId: column('ad_group_id'),
+      adGroupName: column('ad_group_name'),
+      placementName: column('placement_name'),
+      creativeId: column('creative_id'),
+      creativeName: column('creative_name'),
+      creativeFormat: column('creative_format'),
+      impressions: column('impressions'),
+      clicks: column('clicks'),
+      conversions: column('conversions'),
+      spend: column('spend'),
+      ctr: column('ctr'),
+      cpc: column('cpc'),
+      cpm: column('cpm'),
+      roas: column('roas')
+    }
+    
+    // Build records in a single pass over the lines, skipping blank lines and rows without impressions
+    const data: MarketingData[] = []
+    let index = -1
+    for (let lineNumber = headerLine + 1; lineNumber < lines.length; lineNumber++) {
+      const line = lines[lineNumber]
+      if (!line.trim()) continue
+      index++
+      
       const values = line.split(',').map(v => v.trim().replace(/"/g, ''))
-      const row: any = {}
-      headers.forEach((header, i) => {
-        row[header] = values[i] || ''
-      })
+      // Read fields by position instead of building a keyed object per row
+      const field = (i: number) => values[i] || ''
+      
+      const impressions = parseInt(field(col.impressions) || '0')
+      if (!(impressions > 0)) continue
+      
+      // Parse each numeric field once
+      const conversions = parseInt(field(col.conversions) || '0')
+      const spend = parseFloat(field(col.spend) || '0')
+      const roas = parseFloat(field(col.roas) || '0')
+      const campaign = field(col.campaignName) || field(col.canonicalCampaign) || 'Unknown Campaign'
+      const adGroupName = field(col.adGroupName) || 'Unknown Ad Group'
+      const creativeName = field(col.creativeName)
       
       // Map the new CSV structure to our expected format
-      return {
+      data.push({
         id: `row-${index}`,
         source: 'csv_backend' as any,
-        date: row.date || new Date().toISOString().split('T')[0],
+        date: field(col.date) || new Date().toISOString().split('T')[0],
         metrics: {
-          impressions: parseInt(row.impressions || '0'),
-          clicks: parseInt(row.clicks || '0'),
-          conversions: parseInt(row.conversions || '0'),
-          spend: parseFloat(row.spend || '0'),
-          revenue: parseFloat(row.spend || '0') * parseFloat(row.roas || '0'), // Calculate revenue from spend * ROAS
-          ctr: parseFloat(row.ctr || '0'), // Use CTR from CSV
-          cpc: parseFloat(row.cpc || '0'),
-          cpm: parseFloat(row.cpm || '0'),
-          cpa: parseFloat(row.spend || '0') / Math.max(parseInt(row.conversions || '1'), 1), // Calculate CPA
-          roas: parseFloat(row.roas || '0')
+          impressions,
+          clicks: parseInt(field(col.clicks) || '0'),
+          conversions,
+          spend,
+          revenue: spend * roas, // Calculate revenue from spend * ROAS
+          ctr: parseFloat(field(col.ctr) || '0'), // Use CTR from CSV
+          cpc: parseFloat(field(col.cpc) || '0'),
+          cpm: parseFloat(field(col.cpm) || '0'),
+          cpa: spend / Math.max(conversions, 1), // Calculate CPA
+          roas
         },
         dimensions: {
-          brand: row.brand || extractBrandFromCampaign(row.campaign_name || row.canonical_campaign || 'Unknown Campaign'),
-          campaign: row.campaign_name || row.canonical_campaign || 'Unknown Campaign',
-          campaignId: row.campaign_id || '',
-          adGroup: row.ad_group_name || 'Unknown Ad Group',
-          adGroupId: row.ad_group_id || '',
-          ad_group_name: row.ad_group_name || 'Unknown Ad Group',
-          placement_name: row.placement_name || 'Unknown Placement',
-          keyword: row.placement_name || '',
-          platform: row.platform || 'Unknown',
+          brand: field(col.brand) || extractBrandFromCampaign(campaign),
+          campaign,
+          campaignId: field(col.campaignId),
+          adGroup: adGroupName,
+          adGroupId: field(col.adGroupId),
+          ad_group_name: adGroupName,
+          placement_name: field(col.placementName) || 'Unknown Placement',
+          keyword: field(col.placementName),
+          platform: field(col.platform) || 'Unknown',
           location: 'Unknown', // Not in your CSV
-          audience: row.audience || 'General', // Use audience from CSV
-          creativeId: row.creative_id || '',
-          creativeName: row.creative_name || '',
-          creative_name: row.creative_name || '',
-          creative_format: row.creative_format || 'Unknown Format',
+          audience: field(col.audience) || 'General', // Use audience from CSV
+          creativeId: field(col.creativeId),
+          creativeName,
+          creative_name: creativeName,
+          creative_format: field(col.creativeFormat) || 'Unknown Format',
         }
-      }
-    }).filter(item => item.metrics.impressions > 0)
+      })
+    }
     
+    // Callers only read the rows, so the same array can be shared between requests
+    campaignDataCache = { path: csvPath, mtimeMs, size, data }
     return data
     
   } catch (error) {
@@ -75,32 +129,80 @@ export async function loadCampaignData(): Promise<MarketingData[]> {
   }
 }
 
+// Running per-campaign totals collected while scanning the rows
+interface CampaignTotals {
+  rows: number
+  impressions: number
+  clicks: number
+  conversions: number
+  spend: number
+  revenue: number
+  ctrSum: number
+  cpcSum: number
+  cpaSum: number
+}
+
+// Summaries of row arrays already seen; loadCampaignData hands out the same array until the CSV changes
+const dataSummaryCache = new WeakMap<MarketingData[], ReturnType<typeof summarizeData>>()
+
 // Get data summary for dashboard
 export function getDataSummary(data: MarketingData[]) {
-  // Group by campaign name
-  const campaignGroups: Record<string, MarketingData[]> = {}
-  data.forEach(item => {
+  let summary = dataSummaryCache.get(data)
+  if (!summary) {
+    summary = summarizeData(data)
+    dataSummaryCache.set(data, summary)
+  }
+  return summary
+}
+
+function summarizeData(data: MarketingData[]) {
+  // Group by campaign name and accumulate every metric in a single pass
+  const campaignTotals = new Map<string, CampaignTotals>()
+  for (const item of data) {
     const name = item.dimensions.campaign
-    if (!campaignGroups[name]) campaignGroups[name] = []
-    campaignGroups[name].push(item)
-  })
-  const uniqueCampaigns = Object.keys(campaignGroups)
+    let totals = campaignTotals.get(name)
+    if (!totals) {
+      totals = { rows: 0, impressions: 0, clicks: 0, conversions: 0, spend: 0, revenue: 0, ctrSum: 0, cpcSum: 0, cpaSum: 0 }
+      campaignTotals.set(name, totals)
+    }
+    const metrics = item.metrics
+    totals.rows++
+    totals.impressions += metrics.impressions
+    totals.clicks += metrics.clicks
+    totals.conversions += metrics.conversions
+    totals.spend += metrics.spend
+    totals.revenue += metrics.revenue
+    totals.ctrSum += metrics.ctr
+    totals.cpcSum += metrics.cpc
+    totals.cpaSum += metrics.cpa
+  }
+  const uniqueCampaigns = Array.from(campaignTotals.keys())
+
+  // Aggregate metrics per campaign, and overall totals alongside them
+  let totalImpressions = 0
+  let totalClicks = 0
+  let totalConversions = 0
+  let totalSpend = 0
+  let totalRevenue = 0
+  let ctrSum = 0
 
-  // Aggregate metrics per campaign
   const campaignAggregates = uniqueCampaigns.map(name => {
-    const group = campaignGroups[name]
-    const impressions = group.reduce((sum, item) => sum + item.metrics.impressions, 0)
-    const clicks = group.reduce((sum, item) => sum + item.metrics.clicks, 0)
-    const conversions = group.reduce((sum, item) => sum + item.metrics.conversions, 0)
-    const spend = group.reduce((sum, item) => sum + item.metrics.spend, 0)
-    const revenue = group.reduce((sum, item) => sum + item.metrics.revenue, 0)
+    const totals = campaignTotals.get(name)!
+    const { impressions, clicks, conversions, spend, revenue } = totals
     
     // CORRECTED: Average CTR, CPC, CPA from individual values; calculate ROAS from totals
-    const ctr = group.reduce((sum, item) => sum + item.metrics.ctr, 0) / group.length
-    const cpc = group.reduce((sum, item) => sum + item.metrics.cpc, 0) / group.length
-    const cpa = group.reduce((sum, item) => sum + item.metrics.cpa, 0) / group.length
+    const ctr = totals.ctrSum / totals.rows
+    const cpc = totals.cpcSum / totals.rows
+    const cpa = totals.cpaSum / totals.rows
     const roas = spend > 0 ? revenue / spend : 0 // Calculate from totals
     
+    totalImpressions += impressions
+    totalClicks += clicks
+    totalConversions += conversions
+    totalSpend += spend
+    totalRevenue += revenue
+    ctrSum += ctr
+    
     return {
       campaign: name,
       impressions,
@@ -114,16 +216,9 @@ export function getDataSummary(data: MarketingData[]) {
       roas
     }
   })
-
-  // Aggregate overall metrics from campaign aggregates
-  const totalImpressions = campaignAggregates.reduce((sum, c) => sum + c.impressions, 0)
-  const totalClicks = campaignAggregates.reduce((sum, c) => sum + c.clicks, 0)
-  const totalConversions = campaignAggregates.reduce((sum, c) => sum + c.conversions, 0)
-  const totalSpend = campaignAggregates.reduce((sum, c) => sum + c.spend, 0)
-  const totalRevenue = campaignAggregates.reduce((sum, c) => sum + c.revenue, 0)
   
   // Calculate overall averages correctly
-  const averageCTR = campaignAggregates.reduce((sum, c) => sum + c.ctr, 0) / campaignAggregates.length
+  const averageCTR = ctrSum / campaignAggregates.length
   const averageROAS = totalSpend > 0 ? totalRevenue / totalSpend : 0
   
   return {
@@ -4,15 +4,65 @@ Comprehensive QA Test for All Prompt Guide Questions
 Tests if all questions return unique, specific responses rather than generic confirmations
 """
 
+import argparse
+import hashlib
 import requests
 import json
+import re
+import shelve
+import threading
 import time
-from typing import Dict, List, Tuple
-from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from collections import Counter
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson  # optional: faster decoding of API responses
+except ImportError:
+    orjson = None
 
 # API endpoint
 API_URL = "http://localhost:3000/api/ai/query"
 
+# Number of requests kept in flight at once
+MAX_WORKERS = 16
+
+# Questions sent per /api/ai/query batch request (the server accepts up to 50)
+BATCH_SIZE = 8
+
+# One keep-alive session shared by all workers, pooled to match MAX_WORKERS.
+# Throttled (429) and transient 5xx responses are retried with exponential
+# backoff, honouring Retry-After when the server sends it.
+SESSION = requests.Session()
+_retry = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["POST"],
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS, max_retries=_retry)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+# Shared pause set from X-RateLimit-* headers; workers wait it out before sending
+RATE_LIMIT_MIN_REMAINING = 2
+_rate_limit_lock = threading.Lock()
+_rate_limited_until = 0.0
+
+# Per-question results are streamed to RESULTS_PATH; the run summary goes to SUMMARY_PATH
+RESULTS_PATH = "qa_comprehensive_uniqueness_results.jsonl"
+SUMMARY_PATH = "qa_comprehensive_uniqueness_summary.json"
+
+# Opt-in (--cache) on-disk response cache so repeated runs only query new questions.
+# Cached verdicts can predate server changes, so runs report how many answers came from it.
+CACHE_PATH = ".qa_cache"
+CACHE_TTL_SECONDS = 60 * 60
+CACHE_FORMAT = 2  # bump when the shape of cached test_query results changes
+
 # All prompt guide questions organized by category
 PROMPT_QUESTIONS = {
     "Executive Summary & Overview": [
@@ -123,211 +173,360 @@ PROMPT_QUESTIONS = {
     ]
 }
 
-def test_query(query: str) -> Tuple[str, str, str]:
-    """Test a single query and return status, response, and analysis"""
+# Every listed (category, question) in run order; response indices refer to positions in this list
+FLAT_QUESTIONS = [(category, question) for category, questions in PROMPT_QUESTIONS.items() for question in questions]
+
+# Phrases from the API's generic fallback answer
+GENERIC_INDICATORS = [
+    "I understand you're asking about",
+    "I can help you analyze your campaign data",
+    "Try asking about",
+    "• Platform performance",
+    "• Campaign metrics",
+    "• Financial metrics",
+    "• Comparative analysis",
+    "• Executive summary",
+    "• Optimization insights"
+]
+
+# Indicators that tie a query, and the response to it, to a category (first match wins)
+CATEGORY_INDICATORS = {
+    "Executive Summary": ["executive", "summary", "overview", "key metrics", "performance", "📊", "💰", "💎"],
+    "Financial": ["spend", "revenue", "roas", "cpa", "cpc", "cpm", "roi", "profit", "💸", "💰", "💵", "📈"],
+    "Platform": ["meta", "dv360", "amazon", "sa360", "tradedesk", "platform", "🏆", "🥇"],
+    "Weekly": ["week", "weekly", "trend", "breakdown", "📅"],
+    "Campaign": ["campaign", "freshnest", "best", "worst", "ranking", "🎯", "🏆", "📉"],
+    "Optimization": ["optimize", "improve", "opportunity", "recommendation", "strategy", "💡", "🚀", "🔧"],
+    "Analytics": ["ctr", "conversion", "audience", "creative", "performance", "📊", "🎯", "🖱️"],
+    "Creative": ["creative", "audience", "format", "segment", "targeting", "recommendation", "🎨", "👥"]
+}
+
+def compile_indicators(indicators: List[str]) -> re.Pattern:
+    """Compile literal indicators into one alternation so text is scanned once"""
+    return re.compile("|".join(map(re.escape, indicators)))
+
+GENERIC_RE = compile_indicators(GENERIC_INDICATORS)
+CATEGORY_RES = {category: compile_indicators(indicators) for category, indicators in CATEGORY_INDICATORS.items()}
+
+# Each indicator maps to the earliest category that lists it. The lookahead reports an
+# indicator at every position (longest first), so one scan of a query finds every category it hits.
+CATEGORY_NAMES = list(CATEGORY_INDICATORS)
+INDICATOR_RANKS = {}
+for rank, indicators in enumerate(CATEGORY_INDICATORS.values()):
+    for indicator in indicators:
+        INDICATOR_RANKS.setdefault(indicator, rank)
+ANY_INDICATOR_RE = re.compile("(?=(" + "|".join(map(re.escape, sorted(INDICATOR_RANKS, key=len, reverse=True))) + "))")
+
+def classify_query(query_lower: str) -> Optional[str]:
+    """Return the first category, in CATEGORY_INDICATORS order, with an indicator in the query"""
+    ranks = [INDICATOR_RANKS[match.group(1)] for match in ANY_INDICATOR_RE.finditer(query_lower)]
+    return CATEGORY_NAMES[min(ranks)] if ranks else None
+
+# Decorations the API puts in front of answers: one leading emoji, then section headers
+# (each may appear once, in this order). Stripped with a single anchored match.
+RESPONSE_EMOJIS = "🎨📊💰🏆🎯💡👥📈"
+RESPONSE_HEADERS = [
+    "EXECUTIVE SUMMARY", "FINANCIAL PERFORMANCE", "PLATFORM PERFORMANCE", "WEEKLY PERFORMANCE",
+    "CAMPAIGN ANALYSIS", "OPTIMIZATION INSIGHTS", "DETAILED ANALYTICS", "CREATIVE", "AUDIENCE"
+]
+RESPONSE_PREFIX_RE = re.compile(
+    rf"(?:[{RESPONSE_EMOJIS}]\s*)?" + "".join(rf"(?:{re.escape(header)}\s*)?" for header in RESPONSE_HEADERS),
+    re.IGNORECASE
+)
+
+def wait_for_rate_limit():
+    """Block while the server has reported that its rate limit is exhausted"""
+    delay = _rate_limited_until - time.time()
+    if delay > 0:
+        time.sleep(delay)
+
+def update_rate_limit(response):
+    """Record the reset time when X-RateLimit-Remaining runs low"""
+    global _rate_limited_until
+    remaining = response.headers.get('X-RateLimit-Remaining')
+    reset = response.headers.get('X-RateLimit-Reset')
+    if remaining is None or reset is None:
+        return
+    try:
+        if int(remaining) >= RATE_LIMIT_MIN_REMAINING:
+            return
+        reset_at = float(reset)
+    except ValueError:
+        return
+    # Accept both epoch timestamps and seconds-until-reset
+    if reset_at < 10 ** 9:
+        reset_at += time.time()
+    with _rate_limit_lock:
+        _rate_limited_until = max(_rate_limited_until, reset_at)
+
+def analyze_content(query: str, content: str) -> Tuple[str, str, str]:
+    """Classify one API answer and return status, full response, and analysis"""
     
+    # Analyze the response
+    if not content or content.strip() == '':
+        return "ERROR", content, "Empty response"
+    
+    # Check for generic responses
+    is_generic = GENERIC_RE.search(content) is not None
+    
+    if is_generic:
+        return "GENERIC", content, "Generic response detected"
+    else:
+        # Determine which category this query belongs to
+        query_lower = query.lower()
+        matched_category = classify_query(query_lower)
+        
+        # Special handling for specific query patterns that are being misclassified
+        if not matched_category:
+            if 'click-through rate' in query_lower or 'ctr' in query_lower:
+                matched_category = "Analytics"
+            elif 'creative formats' in query_lower or 'creative elements' in query_lower:
+                matched_category = "Creative"
+            elif 'put more money' in query_lower:
+                matched_category = "Optimization"
+        
+        if matched_category:
+            # Check if response has relevant content for that category
+            has_relevant_content = CATEGORY_RES[matched_category].search(content.lower()) is not None
+            
+            if has_relevant_content:
+                return "GOOD", content, f"Specific {matched_category} response"
+            else:
+                return "UNKNOWN", content, f"Response doesn't match {matched_category} indicators"
+        else:
+            return "UNKNOWN", content, "Could not determine category"
+
+def parse_response(response) -> Dict:
+    """Decode a JSON API response, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+def analyze_batch_result(query: str, result: Dict) -> Tuple[str, str, str]:
+    """Classify one entry of a batch response; a query the server failed on carries an error instead of content"""
+    if 'error' in result:
+        return "ERROR", result['error'], f"API error: {result['error']}"
+    return analyze_content(query, result.get('content', ''))
+
+def run_query(query: str) -> Tuple[str, str, str]:
+    """Send a single query and return status, full response, and analysis"""
+    
+    # No sessionId, so the answer never depends on earlier queries' conversation context
     payload = {
         "query": query,
-        "sessionId": f"test_session_{int(time.time())}",
         "data": []  # The API will load sample data
     }
     
     try:
-        response = requests.post(API_URL, json=payload, timeout=30)
+        wait_for_rate_limit()
+        response = SESSION.post(API_URL, json=payload, timeout=30)
+        update_rate_limit(response)
         
         if response.status_code == 200:
-            result = response.json()
-            content = result.get('content', '')
-            
-            # Analyze the response
-            if not content or content.strip() == '':
-                return "ERROR", content, "Empty response"
-            
-            # Check for generic responses
-            generic_indicators = [
-                "I understand you're asking about",
-                "I can help you analyze your campaign data",
-                "Try asking about",
-                "• Platform performance",
-                "• Campaign metrics",
-                "• Financial metrics",
-                "• Comparative analysis",
-                "• Executive summary",
-                "• Optimization insights"
-            ]
-            
-            is_generic = any(indicator in content for indicator in generic_indicators)
-            
-            if is_generic:
-                return "GENERIC", content, "Generic response detected"
-            else:
-                # Check if it's a specific response based on category
-                category_indicators = {
-                    "Executive Summary": ["executive", "summary", "overview", "key metrics", "performance", "📊", "💰", "💎"],
-                    "Financial": ["spend", "revenue", "roas", "cpa", "cpc", "cpm", "roi", "profit", "💸", "💰", "💵", "📈"],
-                    "Platform": ["meta", "dv360", "amazon", "sa360", "tradedesk", "platform", "🏆", "🥇"],
-                    "Weekly": ["week", "weekly", "trend", "breakdown", "📅"],
-                    "Campaign": ["campaign", "freshnest", "best", "worst", "ranking", "🎯", "🏆", "📉"],
-                    "Optimization": ["optimize", "improve", "opportunity", "recommendation", "strategy", "💡", "🚀", "🔧"],
-                    "Analytics": ["ctr", "conversion", "audience", "creative", "performance", "📊", "🎯", "🖱️"],
-                    "Creative": ["creative", "audience", "format", "segment", "targeting", "recommendation", "🎨", "👥"]
-                }
-                
-                # Determine which category this query belongs to
-                query_lower = query.lower()
-                matched_category = None
-                for category, indicators in category_indicators.items():
-                    if any(indicator in query_lower for indicator in indicators):
-                        matched_category = category
-                        break
-                
-                # Special handling for specific query patterns that are being misclassified
-                if not matched_category:
-                    if 'click-through rate' in query_lower or 'ctr' in query_lower:
-                        matched_category = "Analytics"
-                    elif 'creative formats' in query_lower or 'creative elements' in query_lower:
-                        matched_category = "Creative"
-                    elif 'put more money' in query_lower:
-                        matched_category = "Optimization"
-                
-                if matched_category:
-                    # Check if response has relevant content for that category
-                    content_lower = content.lower()
-                    has_relevant_content = any(indicator in content_lower for indicator in category_indicators[matched_category])
-                    
-                    # Additional checks for specific response types
-                    if matched_category == "Financial":
-                        # Check for financial metrics in response
-                        financial_metrics = ["spend", "revenue", "roas", "cpa", "cpc", "roi", "profit", "💸", "💰", "💵"]
-                        has_relevant_content = has_relevant_content or any(metric in content_lower for metric in financial_metrics)
-                    
-                    elif matched_category == "Platform":
-                        # Check for platform-specific content
-                        platform_content = ["platform", "meta", "dv360", "amazon", "sa360", "tradedesk", "🏆", "🥇"]
-                        has_relevant_content = has_relevant_content or any(platform in content_lower for platform in platform_content)
-                    
-                    elif matched_category == "Campaign":
-                        # Check for campaign-specific content
-                        campaign_content = ["campaign", "freshnest", "best", "worst", "ranking", "🎯", "🏆"]
-                        has_relevant_content = has_relevant_content or any(campaign in content_lower for campaign in campaign_content)
-                    
-                    elif matched_category == "Optimization":
-                        # Check for optimization-specific content
-                        optimization_content = ["optimize", "improve", "opportunity", "recommendation", "strategy", "💡", "🚀", "🔧"]
-                        has_relevant_content = has_relevant_content or any(opt in content_lower for opt in optimization_content)
-                    
-                    elif matched_category == "Analytics":
-                        # Check for analytics-specific content
-                        analytics_content = ["ctr", "conversion", "audience", "creative", "performance", "📊", "🎯", "🖱️"]
-                        has_relevant_content = has_relevant_content or any(analytics in content_lower for analytics in analytics_content)
-                    
-                    elif matched_category == "Creative":
-                        # Check for creative/audience-specific content
-                        creative_content = ["creative", "audience", "format", "segment", "targeting", "recommendation", "🎨", "👥"]
-                        has_relevant_content = has_relevant_content or any(creative in content_lower for creative in creative_content)
-                    
-                    if has_relevant_content:
-                        return "GOOD", content, f"Specific {matched_category} response"
-                    else:
-                        return "UNKNOWN", content, f"Response doesn't match {matched_category} indicators"
-                else:
-                    return "UNKNOWN", content, "Could not determine category"
-                    
+            result = parse_response(response)
+            return analyze_content(query, result.get('content', ''))
         else:
             return "ERROR", f"HTTP {response.status_code}", f"API error: {response.text}"
             
     except Exception as e:
         return "ERROR", str(e), f"Exception: {type(e).__name__}"
 
-def analyze_response_uniqueness(responses: List[str]) -> Dict:
-    """Analyze if responses are unique or repetitive"""
-    
-    # Normalize responses for comparison
-    normalized_responses = []
-    for resp in responses:
-        # Remove common prefixes and normalize
-        cleaned = resp.strip()
-        # Remove emoji prefixes
-        if cleaned.startswith("🎨") or cleaned.startswith("📊") or cleaned.startswith("💰") or cleaned.startswith("🏆") or cleaned.startswith("🎯") or cleaned.startswith("💡") or cleaned.startswith("👥") or cleaned.startswith("📈"):
-            cleaned = cleaned[1:].strip()
-        # Remove common headers
-        for header in ["EXECUTIVE SUMMARY", "FINANCIAL PERFORMANCE", "PLATFORM PERFORMANCE", "WEEKLY PERFORMANCE", "CAMPAIGN ANALYSIS", "OPTIMIZATION INSIGHTS", "DETAILED ANALYTICS", "CREATIVE", "AUDIENCE"]:
-            if cleaned.upper().startswith(header):
-                cleaned = cleaned[len(header):].strip()
+def run_batch(queries: List[str]) -> List[Tuple[str, str, str]]:
+    """Send several queries in one request and return status, full response, and analysis for each"""
+    
+    # No sessionId, so the server answers every query without conversation context
+    payload = {
+        "queries": queries,
+        "data": []  # The API will load sample data
+    }
+    
+    try:
+        wait_for_rate_limit()
+        response = SESSION.post(API_URL, json=payload, timeout=30 * len(queries))
+        update_rate_limit(response)
         
-        normalized_responses.append(cleaned.lower())
+        if response.status_code == 200:
+            results = parse_response(response).get('results', [])
+            if len(results) == len(queries):
+                return [analyze_batch_result(query, result) for query, result in zip(queries, results)]
+            error = ("ERROR", f"Batch returned {len(results)} results", f"API error: expected {len(queries)} results")
+        elif response.status_code in (400, 404):
+            # Server without batch support: ask one query at a time instead
+            return [run_query(query) for query in queries]
+        else:
+            error = ("ERROR", f"HTTP {response.status_code}", f"API error: {response.text}")
+            
+    except Exception as e:
+        error = ("ERROR", str(e), f"Exception: {type(e).__name__}")
+    
+    return [error] * len(queries)
+
+def summarize_result(status: str, content: str, analysis: str) -> Tuple[str, str, bytes, str]:
+    """Keep only a display preview and a fingerprint of the full response"""
+    preview = content[:200] + "..." if len(content) > 200 else content
+    return status, preview, fingerprint_response(content), analysis
+
+def test_query(query: str) -> Tuple[str, str, bytes, str]:
+    """Test a single query and return status, response preview, response fingerprint, and analysis"""
+    return summarize_result(*run_query(query))
+
+def test_batch(queries: List[str], futures: List[Future]):
+    """Test a batch of queries, resolving each query's future with its test_query-style result"""
+    try:
+        for future, result in zip(futures, run_batch(queries)):
+            future.set_result(summarize_result(*result))
+    except Exception as e:
+        for future in futures:
+            if not future.done():
+                future.set_exception(e)
+
+def cache_key(query: str) -> str:
+    """Build the response cache key, scoped to the API being tested and the result format"""
+    return hashlib.sha1(f"{CACHE_FORMAT}\n{API_URL}\n{query}".encode("utf-8")).hexdigest()
+
+def get_cached_result(cache, query: str) -> Optional[Tuple[str, str, bytes, str]]:
+    """Return a cached test_query result if it is still fresh"""
+    if cache is None:
+        return None
+    
+    entry = cache.get(cache_key(query))
+    if entry and time.time() - entry["ts"] < CACHE_TTL_SECONDS:
+        return entry["val"]
+    return None
+
+def store_cached_result(cache, query: str, result: Tuple[str, str, bytes, str]):
+    """Cache a test_query result; errors are not cached so they are retried next run"""
+    if cache is None or result[0] == "ERROR":
+        return
+    
+    cache[cache_key(query)] = {"ts": time.time(), "val": result}
+
+def normalize_response(resp: str) -> str:
+    """Strip decorative prefixes and case so responses compare on their substance"""
+    cleaned = resp.strip()
+    # Remove emoji prefix and common headers
+    cleaned = cleaned[RESPONSE_PREFIX_RE.match(cleaned).end():]
     
-    # Count unique responses
-    unique_responses = set(normalized_responses)
-    uniqueness_ratio = len(unique_responses) / len(normalized_responses) if normalized_responses else 0
+    return cleaned.lower()
+
+def fingerprint_response(resp: str) -> bytes:
+    """Hash the normalized response so uniqueness checks never hold full response bodies"""
+    return hashlib.blake2b(normalize_response(resp).encode("utf-8"), digest_size=16).digest()
+
+def analyze_response_uniqueness(fingerprints: List[bytes]) -> Dict:
+    """Analyze if responses are unique or repetitive, given their fingerprints"""
     
-    # Find duplicates
+    # Count and find duplicates in a single pass
     duplicates = []
     seen = {}
-    for i, resp in enumerate(normalized_responses):
-        if resp in seen:
-            duplicates.append((seen[resp], i))
+    for i, fingerprint in enumerate(fingerprints):
+        if fingerprint in seen:
+            duplicates.append((seen[fingerprint], i))
         else:
-            seen[resp] = i
+            seen[fingerprint] = i
+    
+    uniqueness_ratio = len(seen) / len(fingerprints) if fingerprints else 0
     
     return {
-        "total_responses": len(responses),
-        "unique_responses": len(unique_responses),
+        "total_responses": len(fingerprints),
+        "unique_responses": len(seen),
         "uniqueness_ratio": uniqueness_ratio,
         "duplicate_pairs": duplicates
     }
 
-def main():
+def main(use_cache: bool = False):
     print("🔍 COMPREHENSIVE UNIQUENESS QA TEST")
     print("=" * 60)
     print()
     
     all_results = {}
-    all_responses = []
+    all_fingerprints = []
+    status_counts_by_category = {}
+    
+    # The shelf is only touched from this thread; workers just run test_query
+    cache = shelve.open(CACHE_PATH) if use_cache else None
+    results_file = open(RESULTS_PATH, 'w')
+    
+    # Queries are independent, so they are sent in batches that all run concurrently; results are
+    # still reported in order. Repeated questions share a single answer instead of hitting the API again.
+    executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    question_futures = {}
+    uncached_questions = set()
+    for _, question in FLAT_QUESTIONS:
+        if question in question_futures:
+            continue
+        
+        question_futures[question] = Future()
+        cached = get_cached_result(cache, question)
+        if cached is not None:
+            question_futures[question].set_result(cached)
+        else:
+            uncached_questions.add(question)
+    
+    cached_count = len(question_futures) - len(uncached_questions)
+    if cache is not None:
+        print(f"♻️  Served from cache (up to {CACHE_TTL_SECONDS // 60} min old): {cached_count}/{len(question_futures)} distinct questions")
+        print()
+    
+    pending = [question for question in question_futures if question in uncached_questions]
+    for start in range(0, len(pending), BATCH_SIZE):
+        batch = pending[start:start + BATCH_SIZE]
+        executor.submit(test_batch, batch, [question_futures[question] for question in batch])
     
     for category, questions in PROMPT_QUESTIONS.items():
         print(f"📋 Testing Category: {category}")
         print("-" * 50)
         
         category_results = []
-        category_responses = []
+        status_counts = Counter()
         
         for i, question in enumerate(questions, 1):
             print(f"  {i}. Testing: {question}")
             
-            status, response, analysis = test_query(question)
+            status, response, fingerprint, analysis = question_futures[question].result()
+            if question in uncached_questions:
+                store_cached_result(cache, question, (status, response, fingerprint, analysis))
+                uncached_questions.discard(question)
             category_results.append({
                 "question": question,
                 "status": status,
-                "response": response[:200] + "..." if len(response) > 200 else response,
+                "response": response,
                 "analysis": analysis
             })
-            category_responses.append(response)
-            all_responses.append(response)
+            all_fingerprints.append(fingerprint)
+            status_counts[status] += 1
+            
+            # Write each result as soon as it is known so partial runs still leave a record
+            results_file.write(json.dumps({
+                "category": category,
+                "question": question,
+                "status": status,
+                "analysis": analysis,
+                "response": response
+            }, separators=(',', ':')) + "\n")
+            results_file.flush()
             
             print(f"      Status: {status}")
             print(f"      Analysis: {analysis}")
             print(f"      Response: {response[:100]}...")
             print()
-            
-            # Small delay between requests
-            time.sleep(0.5)
         
         all_results[category] = category_results
+        status_counts_by_category[category] = status_counts
         
         # Category summary
-        status_counts = {}
-        for result in category_results:
-            status = result["status"]
-            status_counts[status] = status_counts.get(status, 0) + 1
-        
         print(f"📊 {category} Summary:")
         for status, count in status_counts.items():
             print(f"  {status}: {count} ({count/len(category_results)*100:.1f}%)")
         print()
     
+    executor.shutdown()
+    results_file.close()
+    if cache is not None:
+        cache.close()
+    
     # Overall uniqueness analysis
-    uniqueness_analysis = analyze_response_uniqueness(all_responses)
+    uniqueness_analysis = analyze_response_uniqueness(all_fingerprints)
     
     # Print comprehensive results
     print("📊 COMPREHENSIVE QA RESULTS")
@@ -335,12 +534,11 @@ def main():
     
     total_questions = sum(len(questions) for questions in PROMPT_QUESTIONS.values())
     print(f"Total Questions Tested: {total_questions}")
+    if cache is not None:
+        print(f"Distinct Questions Served From Cache: {cached_count}")
     
     # Overall status counts
-    overall_status_counts = defaultdict(int)
-    for category_results in all_results.values():
-        for result in category_results:
-            overall_status_counts[result["status"]] += 1
+    overall_status_counts = sum(status_counts_by_category.values(), Counter())
     
     print("\n🎯 OVERALL STATUS BREAKDOWN:")
     for status, count in overall_status_counts.items():
@@ -355,25 +553,18 @@ def main():
     if uniqueness_analysis['duplicate_pairs']:
         print(f"  Duplicate Response Pairs: {len(uniqueness_analysis['duplicate_pairs'])}")
         print("  Duplicate questions:")
-        question_index = 0
-        for category, questions in PROMPT_QUESTIONS.items():
-            for i, question in enumerate(questions):
-                for dup1, dup2 in uniqueness_analysis['duplicate_pairs']:
-                    if dup1 == question_index or dup2 == question_index:
-                        print(f"    - {category}: {question}")
-                question_index += 1
+        for dup1, dup2 in uniqueness_analysis['duplicate_pairs']:
+            category1, question1 = FLAT_QUESTIONS[dup1]
+            category2, question2 = FLAT_QUESTIONS[dup2]
+            print(f"    - {category1}: {question1}  <=>  {category2}: {question2}")
     
     print()
     print("📈 CATEGORY BREAKDOWN:")
-    for category, results in all_results.items():
-        status_counts = {}
-        for result in results:
-            status = result["status"]
-            status_counts[status] = status_counts.get(status, 0) + 1
-        
+    for category, status_counts in status_counts_by_category.items():
+        category_total = sum(status_counts.values())
         print(f"\n{category}:")
         for status, count in status_counts.items():
-            print(f"  {status}: {count} ({count/len(results)*100:.1f}%)")
+            print(f"  {status}: {count} ({count/category_total*100:.1f}%)")
     
     print()
     print("🚨 PROBLEMATIC QUESTIONS (Generic/Error/Unknown):")
@@ -390,18 +581,22 @@ def main():
                 print(f"     Response: {result['response']}")
                 print()
     
-    # Save detailed results
-    with open('qa_comprehensive_uniqueness_results.json', 'w') as f:
+    # Save the run summary; per-question results were streamed during the run
+    with open(SUMMARY_PATH, 'w') as f:
         json.dump({
             "summary": {
                 "total_questions": total_questions,
                 "overall_status_counts": dict(overall_status_counts),
                 "uniqueness_analysis": uniqueness_analysis
-            },
-            "category_results": all_results
+            }
         }, f, indent=2)
     
-    print(f"💾 Detailed results saved to: qa_comprehensive_uniqueness_results.json")
+    print(f"💾 Detailed results saved to: {RESULTS_PATH}")
+    print(f"💾 Summary saved to: {SUMMARY_PATH}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Comprehensive uniqueness QA test for prompt guide questions")
+    parser.add_argument("--cache", action="store_true", help=f"reuse responses cached by runs in the last {CACHE_TTL_SECONDS // 60} minutes instead of querying the API")
+    args = parser.parse_args()
+    
+    main(use_cache=args.cache) 
\ No newline at end of file
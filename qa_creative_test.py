@@ -4,14 +4,50 @@ Focused QA Test for Creative Questions
 Tests if creative questions return unique, specific responses rather than generic confirmations
 """
 
+import hashlib
 import requests
 import json
-import time
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson  # optional: faster decoding of API responses
+except ImportError:
+    orjson = None
 
 # API endpoint
 API_URL = "http://localhost:3000/api/ai/query"
 
+# Number of queries kept in flight at once
+MAX_WORKERS = 8
+
+# Questions sent per batch request (the API accepts up to 50)
+BATCH_SIZE = 10
+
+# One keep-alive session shared by all workers, pooled to match MAX_WORKERS.
+# Requests are not paced; only throttled (429) and transient 5xx responses
+# are retried, with exponential backoff that honours Retry-After.
+SESSION = requests.Session()
+_retry = Retry(
+    total=3,
+    backoff_factor=0.1,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["POST"],
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS, max_retries=_retry)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+# Per-question results are streamed to RESULTS_PATH; the run summary goes to SUMMARY_PATH
+RESULTS_PATH = "qa_creative_results.jsonl"
+SUMMARY_PATH = "qa_creative_summary.json"
+
 # Creative questions to test
 CREATIVE_QUESTIONS = [
     "How did our creatives perform?",
@@ -27,94 +63,139 @@ CREATIVE_QUESTIONS = [
     "How did our creatives perform?"
 ]
 
+# Phrases from the API's generic fallback answer, matched in one regex pass
+GENERIC_INDICATORS = (
+    "I understand you're asking about",
+    "I can help you analyze your campaign data",
+    "Try asking about",
+    "• Platform performance",
+    "• Campaign metrics",
+    "• Financial metrics",
+    "• Comparative analysis",
+    "• Executive summary",
+    "• Optimization insights"
+)
+GENERIC_RE = re.compile("|".join(map(re.escape, GENERIC_INDICATORS)))
+
+# Words that mark a response as creative-specific, also matched in one regex pass
+CREATIVE_INDICATORS = (
+    "creative", "audience", "format", "segment", "targeting",
+    "performance", "breakdown", "optimization", "recommendation",
+    "conversion", "platform", "insight"
+)
+CREATIVE_RE = re.compile("|".join(map(re.escape, CREATIVE_INDICATORS)))
+
+# Decoration the API puts in front of creative answers, stripped with a single anchored match
+RESPONSE_PREFIX_RE = re.compile(r"(?:🎨\s*)?(?:CREATIVE\s*)?")
+
+def parse_response(response) -> Dict:
+    """Decode a JSON API response, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+def analyze_content(content: str) -> Tuple[str, str, str]:
+    """Classify a response body and return status, response, and analysis"""
+    if not content or content.strip() == '':
+        return "ERROR", content, "Empty response"
+    
+    # Check for generic responses
+    is_generic = GENERIC_RE.search(content) is not None
+    
+    if is_generic:
+        return "GENERIC", content, "Generic response detected"
+    else:
+        # Check if it's a specific creative response
+        has_creative_content = CREATIVE_RE.search(content.lower()) is not None
+        
+        if has_creative_content:
+            return "GOOD", content, "Specific creative response"
+        else:
+            return "UNKNOWN", content, "Response doesn't match creative indicators"
+
+def analyze_batch_result(result: Dict) -> Tuple[str, str, str]:
+    """Classify one entry of a batch response; a query the server failed on carries an error instead of content"""
+    if 'error' in result:
+        return "ERROR", result['error'], f"API error: {result['error']}"
+    return analyze_content(result.get('content', ''))
+
 def test_creative_query(query: str) -> Tuple[str, str, str]:
     """Test a single creative query and return status, response, and analysis"""
     
+    # No sessionId, so the answer never depends on earlier queries' conversation context
     payload = {
         "query": query,
-        "sessionId": f"test_session_{int(time.time())}",
         "data": []  # The API will load sample data
     }
     
     try:
-        response = requests.post(API_URL, json=payload, timeout=30)
+        response = SESSION.post(API_URL, json=payload, timeout=30)
         
         if response.status_code == 200:
-            result = response.json()
-            content = result.get('content', '')
-            
-            # Analyze the response
-            if not content or content.strip() == '':
-                return "ERROR", content, "Empty response"
-            
-            # Check for generic responses
-            generic_indicators = [
-                "I understand you're asking about",
-                "I can help you analyze your campaign data",
-                "Try asking about",
-                "• Platform performance",
-                "• Campaign metrics",
-                "• Financial metrics",
-                "• Comparative analysis",
-                "• Executive summary",
-                "• Optimization insights"
-            ]
-            
-            is_generic = any(indicator in content for indicator in generic_indicators)
-            
-            if is_generic:
-                return "GENERIC", content, "Generic response detected"
-            else:
-                # Check if it's a specific creative response
-                creative_indicators = [
-                    "creative", "audience", "format", "segment", "targeting",
-                    "performance", "breakdown", "optimization", "recommendation",
-                    "conversion", "platform", "insight"
-                ]
-                
-                has_creative_content = any(indicator in content.lower() for indicator in creative_indicators)
-                
-                if has_creative_content:
-                    return "GOOD", content, "Specific creative response"
-                else:
-                    return "UNKNOWN", content, "Response doesn't match creative indicators"
-                    
+            result = parse_response(response)
+            return analyze_content(result.get('content', ''))
         else:
             return "ERROR", f"HTTP {response.status_code}", f"API error: {response.text}"
             
     except Exception as e:
         return "ERROR", str(e), f"Exception: {type(e).__name__}"
 
-def analyze_response_uniqueness(responses: List[str]) -> Dict:
-    """Analyze if responses are unique or repetitive"""
-    
-    # Remove common prefixes/suffixes and normalize
-    normalized_responses = []
-    for resp in responses:
-        # Remove common prefixes
-        cleaned = resp.strip()
-        if cleaned.startswith("🎨"):
-            cleaned = cleaned[1:].strip()
-        if cleaned.startswith("CREATIVE"):
-            cleaned = cleaned[8:].strip()
+def test_creative_batch(queries: List[str]) -> List[Tuple[str, str, str]]:
+    """Send several creative queries in one request and return status, response, and analysis for each"""
+    
+    # No sessionId, so the server answers every query without conversation context
+    payload = {
+        "queries": queries,
+        "data": []  # The API will load sample data
+    }
+    
+    try:
+        response = SESSION.post(API_URL, json=payload, timeout=30 * len(queries))
         
-        normalized_responses.append(cleaned.lower())
+        if response.status_code == 200:
+            results = parse_response(response).get('results', [])
+            if len(results) == len(queries):
+                return [analyze_batch_result(result) for result in results]
+            error = ("ERROR", f"Batch returned {len(results)} results", f"API error: expected {len(queries)} results")
+        elif response.status_code in (400, 404):
+            # Server without batch support: ask one query at a time instead
+            return [test_creative_query(query) for query in queries]
+        else:
+            error = ("ERROR", f"HTTP {response.status_code}", f"API error: {response.text}")
+            
+    except Exception as e:
+        error = ("ERROR", str(e), f"Exception: {type(e).__name__}")
+    
+    return [error] * len(queries)
+
+def normalize_response(resp: str) -> str:
+    """Strip decorative prefixes and case so responses compare on their substance"""
+    cleaned = resp.strip()
+    # Remove common prefixes
+    cleaned = cleaned[RESPONSE_PREFIX_RE.match(cleaned).end():]
     
-    # Count unique responses
-    unique_responses = set(normalized_responses)
-    uniqueness_ratio = len(unique_responses) / len(normalized_responses) if normalized_responses else 0
+    return cleaned.lower()
+
+def fingerprint_response(resp: str) -> bytes:
+    """Hash the normalized response so uniqueness checks never hold full response bodies"""
+    return hashlib.blake2b(normalize_response(resp).encode("utf-8"), digest_size=16).digest()
+
+def analyze_response_uniqueness(fingerprints: List[bytes]) -> Dict:
+    """Analyze if responses are unique or repetitive, given their fingerprints"""
     
-    # Find duplicates
+    # Count and find duplicates in a single pass
     duplicates = []
     seen = set()
-    for i, resp in enumerate(normalized_responses):
-        if resp in seen:
+    for i, fingerprint in enumerate(fingerprints):
+        if fingerprint in seen:
             duplicates.append(i)
-        seen.add(resp)
+        seen.add(fingerprint)
+    
+    uniqueness_ratio = len(seen) / len(fingerprints) if fingerprints else 0
     
     return {
-        "total_responses": len(responses),
-        "unique_responses": len(unique_responses),
+        "total_responses": len(fingerprints),
+        "unique_responses": len(seen),
         "uniqueness_ratio": uniqueness_ratio,
         "duplicate_indices": duplicates
     }
@@ -125,40 +206,63 @@ def main():
     print()
     
     results = []
-    responses = []
+    fingerprints = []
     
-    for i, question in enumerate(CREATIVE_QUESTIONS, 1):
-        print(f"Testing {i}/{len(CREATIVE_QUESTIONS)}: {question}")
-        
-        status, response, analysis = test_creative_query(question)
-        results.append({
-            "question": question,
-            "status": status,
-            "response": response[:200] + "..." if len(response) > 200 else response,
-            "analysis": analysis
-        })
-        responses.append(response)
-        
-        print(f"  Status: {status}")
-        print(f"  Analysis: {analysis}")
-        print(f"  Response: {response[:100]}...")
-        print()
+    # Send each distinct question once; repeated questions reuse its answer
+    unique_questions = Counter(CREATIVE_QUESTIONS)
+    answers = {}
+    
+    # Questions go out in batches that run concurrently; progress is still reported in question order
+    questions = list(unique_questions)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {}
+        for start in range(0, len(questions), BATCH_SIZE):
+            batch = questions[start:start + BATCH_SIZE]
+            future = executor.submit(test_creative_batch, batch)
+            for offset, question in enumerate(batch):
+                futures[question] = (future, offset)
         
-        # Small delay between requests
-        time.sleep(1)
+        for i, (question, count) in enumerate(unique_questions.items(), 1):
+            repeat_note = f" (x{count})" if count > 1 else ""
+            print(f"Testing {i}/{len(unique_questions)}: {question}{repeat_note}")
+            
+            future, offset = futures[question]
+            status, response, analysis = future.result()[offset]
+            
+            # Keep only a display preview and a fingerprint of the full response
+            preview = response[:200] + "..." if len(response) > 200 else response
+            answers[question] = (status, preview, fingerprint_response(response), analysis)
+            
+            print(f"  Status: {status}")
+            print(f"  Analysis: {analysis}")
+            print(f"  Response: {response[:100]}...")
+            print()
+    
+    # Fan answers back out so every listed question keeps its own result
+    status_counts = Counter()
+    with open(RESULTS_PATH, 'w') as results_file:
+        for question in CREATIVE_QUESTIONS:
+            status, preview, fingerprint, analysis = answers[question]
+            status_counts[status] += 1
+            result = {
+                "question": question,
+                "status": status,
+                "response": preview,
+                "analysis": analysis
+            }
+            results.append(result)
+            fingerprints.append(fingerprint)
+            
+            # One compact JSON line per result
+            results_file.write(json.dumps(result, separators=(',', ':')) + "\n")
     
     # Analyze uniqueness
-    uniqueness_analysis = analyze_response_uniqueness(responses)
+    uniqueness_analysis = analyze_response_uniqueness(fingerprints)
     
     # Print summary
     print("📊 CREATIVE QA RESULTS SUMMARY")
     print("=" * 50)
     
-    status_counts = {}
-    for result in results:
-        status = result["status"]
-        status_counts[status] = status_counts.get(status, 0) + 1
-    
     print(f"Total Questions: {len(results)}")
     for status, count in status_counts.items():
         print(f"{status}: {count} ({count/len(results)*100:.1f}%)")
@@ -187,18 +291,18 @@ def main():
         print(f"   Response: {result['response']}")
         print()
     
-    # Save detailed results
-    with open('qa_creative_results.json', 'w') as f:
+    # Save the run summary; per-question results were written as they were collected
+    with open(SUMMARY_PATH, 'w') as f:
         json.dump({
             "summary": {
                 "total_questions": len(results),
-                "status_counts": status_counts,
+                "status_counts": dict(status_counts),
                 "uniqueness_analysis": uniqueness_analysis
-            },
-            "detailed_results": results
+            }
         }, f, indent=2)
     
-    print(f"💾 Detailed results saved to: qa_creative_results.json")
+    print(f"💾 Detailed results saved to: {RESULTS_PATH}")
+    print(f"💾 Summary saved to: {SUMMARY_PATH}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
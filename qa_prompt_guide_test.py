@@ -6,12 +6,46 @@ Tests all questions in the prompt guide to ensure they return proper responses
 
 import requests
 import json
+import re
 import time
-from typing import List, Dict, Any
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson  # optional: faster decoding of API responses and encoding of the results file
+except ImportError:
+    orjson = None
 
 # API endpoint
 API_URL = "https://marketing-data-app.vercel.app/api/ai/query"
 
+# Per-question results are streamed to RESULTS_PATH; the run summary goes to SUMMARY_PATH
+RESULTS_PATH = "qa_prompt_guide_results.jsonl"
+SUMMARY_PATH = "qa_prompt_guide_summary.json"
+
+# Number of requests kept in flight at once
+MAX_WORKERS = 8
+
+# Questions sent per batch request (the API accepts up to 50)
+BATCH_SIZE = 10
+
+# One keep-alive session for the whole run so HTTPS connections are reused.
+# Requests are not paced; only throttled (429) and transient 5xx responses
+# are retried, with exponential backoff that honours Retry-After.
+SESSION = requests.Session()
+_retry = Retry(
+    total=3,
+    backoff_factor=1,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["POST"],
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_retry))
+
 # All prompt guide questions organized by category
 PROMPT_QUESTIONS = {
     "Executive Summary & Overview": [
@@ -122,44 +156,117 @@ PROMPT_QUESTIONS = {
     ]
 }
 
-def test_single_query(query: str, session_id: str = None) -> Dict[str, Any]:
+# Generic response indicators (matched against lowercased content in one regex pass)
+GENERIC_PHRASES = (
+    "i understand you're asking about",
+    "i can help you analyze your campaign data",
+    "try asking about:",
+    "platform performance (e.g.,",
+    "campaign metrics (e.g.,",
+    "financial metrics (e.g.,",
+    "comparative analysis (e.g.,",
+    "executive summary (e.g.,",
+    "optimization insights (e.g.,"
+)
+GENERIC_RE = re.compile("|".join(map(re.escape, GENERIC_PHRASES)))
+
+# Response data types that indicate a specific answer
+GOOD_DATA_TYPES = frozenset([
+    "executive_summary", "financial_summary", "roas_summary", "cpa_summary",
+    "platform_performance", "platform_comparison", "campaign_performance",
+    "weekly_performance", "optimization_insights", "anomaly_detection",
+    "time_context", "chart_request"
+])
+
+# Content that shows a response refers to real campaign data (matched against lowercased content in one regex pass)
+SPECIFIC_INDICATORS = (
+    "$", "spend", "revenue", "roas", "cpa", "ctr", "impressions", "clicks", "conversions",
+    "meta", "amazon", "dv360", "cm360", "sa360", "tradedesk",
+    "freshnest", "summer grilling", "back to school", "holiday recipes", "pantry staples",
+    "week 1", "week 2", "week 3", "week 4", "june 2024",
+    "optimize", "recommendations", "opportunities", "improve"
+)
+SPECIFIC_RE = re.compile("|".join(map(re.escape, SPECIFIC_INDICATORS)))
+
+# Marker printed next to each result status
+STATUS_EMOJI = {
+    "GOOD": "✅",
+    "GENERIC": "❌",
+    "ERROR": "💥",
+    "UNKNOWN": "❓"
+}
+
+def parse_response(response) -> Dict[str, Any]:
+    """Decode a JSON API response, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+def encode_json_line(record: Dict[str, Any]) -> bytes:
+    """Encode one compact JSONL record, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(record) + b"\n"
+    return json.dumps(record, separators=(',', ':')).encode("utf-8") + b"\n"
+
+def test_single_query(query: str) -> Dict[str, Any]:
     """Test a single query and return the response"""
-    if session_id is None:
-        session_id = f"qa_test_{int(time.time())}"
-    
+    # No sessionId, so the answer never depends on earlier queries' conversation context
     payload = {
-        "query": query,
-        "sessionId": session_id
+        "query": query
     }
     
     try:
-        response = requests.post(API_URL, json=payload, timeout=30)
+        response = SESSION.post(API_URL, json=payload, timeout=30)
         response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        return parse_response(response)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        # ValueError covers a non-JSON body when orjson does the decoding
         return {"error": str(e), "query": query}
 
-def is_generic_response(response: Dict[str, Any]) -> bool:
+def test_batch_query(queries: List[str]) -> List[Dict[str, Any]]:
+    """Test several queries in one request and return their responses in order"""
+    # No sessionId, so the server answers every query without conversation context
+    payload = {
+        "queries": queries
+    }
+    
+    try:
+        response = SESSION.post(API_URL, json=payload, timeout=30 * len(queries))
+        if response.status_code in (400, 404):
+            # Server without batch support: ask one query at a time instead
+            return [test_single_query(query) for query in queries]
+        response.raise_for_status()
+        results = parse_response(response).get("results", [])
+    except (requests.exceptions.RequestException, ValueError) as e:
+        # ValueError covers a non-JSON body when orjson does the decoding
+        return [{"error": str(e), "query": query} for query in queries]
+    
+    if len(results) != len(queries):
+        error = f"Batch returned {len(results)} results for {len(queries)} queries"
+        return [{"error": error, "query": query} for query in queries]
+    return results
+
+def resolve_batch_query(queries: List[str], futures: List[Future]):
+    """Run test_batch_query and hand each query's analyzed response to its future"""
+    try:
+        # Classify in the worker so it overlaps with other batches still in flight
+        for query, future, response in zip(queries, futures, test_batch_query(queries)):
+            future.set_result(analyze_response_quality(response, query))
+    except Exception as e:
+        for future in futures:
+            if not future.done():
+                future.set_exception(e)
+
+def is_generic_response(response: Dict[str, Any], content_lower: Optional[str] = None) -> bool:
     """Check if response is generic (not specific to the query)"""
     if "error" in response:
         return True
     
-    content = response.get("content", "").lower()
-    
-    # Generic response indicators
-    generic_phrases = [
-        "i understand you're asking about",
-        "i can help you analyze your campaign data",
-        "try asking about:",
-        "platform performance (e.g.,",
-        "campaign metrics (e.g.,",
-        "financial metrics (e.g.,",
-        "comparative analysis (e.g.,",
-        "executive summary (e.g.,",
-        "optimization insights (e.g.,"
-    ]
+    # Callers that already lowercased the content can pass it in
+    if content_lower is None:
+        content_lower = response.get("content", "").lower()
     
-    return any(phrase in content for phrase in generic_phrases)
+    return GENERIC_RE.search(content_lower) is not None
 
 def analyze_response_quality(response: Dict[str, Any], query: str) -> Dict[str, Any]:
     """Analyze the quality of a response"""
@@ -171,10 +278,11 @@ def analyze_response_quality(response: Dict[str, Any], query: str) -> Dict[str,
         }
     
     content = response.get("content", "")
+    content_lower = content.lower()
     data_type = response.get("data", {}).get("type", "unknown")
     
     # Check if it's a generic response
-    if is_generic_response(response):
+    if is_generic_response(response, content_lower):
         return {
             "status": "GENERIC",
             "data_type": data_type,
@@ -183,14 +291,7 @@ def analyze_response_quality(response: Dict[str, Any], query: str) -> Dict[str,
         }
     
     # Check for specific data types that indicate good responses
-    good_data_types = [
-        "executive_summary", "financial_summary", "roas_summary", "cpa_summary",
-        "platform_performance", "platform_comparison", "campaign_performance",
-        "weekly_performance", "optimization_insights", "anomaly_detection",
-        "time_context", "chart_request"
-    ]
-    
-    if data_type in good_data_types:
+    if data_type in GOOD_DATA_TYPES:
         return {
             "status": "GOOD",
             "data_type": data_type,
@@ -199,16 +300,7 @@ def analyze_response_quality(response: Dict[str, Any], query: str) -> Dict[str,
         }
     
     # Check content for specific indicators
-    specific_indicators = [
-        "$", "spend", "revenue", "roas", "cpa", "ctr", "impressions", "clicks", "conversions",
-        "meta", "amazon", "dv360", "cm360", "sa360", "tradedesk",
-        "freshnest", "summer grilling", "back to school", "holiday recipes", "pantry staples",
-        "week 1", "week 2", "week 3", "week 4", "june 2024",
-        "optimize", "recommendations", "opportunities", "improve"
-    ]
-    
-    content_lower = content.lower()
-    has_specific_data = any(indicator in content_lower for indicator in specific_indicators)
+    has_specific_data = SPECIFIC_RE.search(content_lower) is not None
     
     if has_specific_data:
         return {
@@ -230,51 +322,61 @@ def run_comprehensive_qa():
     print("🚀 Starting Comprehensive QA Test for Prompt Guide Questions")
     print("=" * 80)
     
-    session_id = f"qa_comprehensive_{int(time.time())}"
     results = {}
-    summary = {
-        "total_questions": 0,
-        "good_responses": 0,
-        "generic_responses": 0,
-        "error_responses": 0,
-        "unknown": 0
-    }
+    status_counts_by_category = {}
+    results_file = open(RESULTS_PATH, "wb")
+    
+    # Queries are sent in batches that run concurrently; results are still reported in question order.
+    # Repeated questions share a single answer instead of hitting the API again.
+    executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    question_futures = {}
+    for questions in PROMPT_QUESTIONS.values():
+        for question in questions:
+            if question not in question_futures:
+                question_futures[question] = Future()
+    
+    distinct_questions = list(question_futures)
+    for start in range(0, len(distinct_questions), BATCH_SIZE):
+        batch = distinct_questions[start:start + BATCH_SIZE]
+        executor.submit(resolve_batch_query, batch, [question_futures[question] for question in batch])
     
     for category, questions in PROMPT_QUESTIONS.items():
         print(f"\n📋 Testing Category: {category}")
         print("-" * 50)
         
         category_results = []
+        status_counts = Counter()
         
         for i, question in enumerate(questions, 1):
             print(f"  {i:2d}. Testing: {question}")
             
-            # Test the query
-            response = test_single_query(question, session_id)
-            analysis = analyze_response_quality(response, question)
+            # Collect the analyzed response
+            analysis = question_futures[question].result()
             category_results.append(analysis)
+            status_counts[analysis["status"]] += 1
             
-            # Update summary
-            summary["total_questions"] += 1
-            status_key = analysis["status"].lower() + "_responses"
-            if status_key in summary:
-                summary[status_key] += 1
-            else:
-                summary["unknown"] += 1
+            # Stream each result through a buffered file instead of holding a report to dump at the end
+            results_file.write(encode_json_line({"category": category, **analysis}))
             
             # Print result
-            status_emoji = {
-                "GOOD": "✅",
-                "GENERIC": "❌",
-                "ERROR": "💥",
-                "UNKNOWN": "❓"
-            }
-            print(f"      {status_emoji.get(analysis['status'], '❓')} {analysis['status']}")
-            
-            # Add delay to avoid rate limiting
-            time.sleep(1)
+            print(f"      {STATUS_EMOJI.get(analysis['status'], '❓')} {analysis['status']}")
         
         results[category] = category_results
+        status_counts_by_category[category] = status_counts
+    
+    executor.shutdown()
+    results_file.close()
+    
+    # Overall counts; any status other than GOOD/GENERIC/ERROR is reported as unknown
+    overall_status_counts = sum(status_counts_by_category.values(), Counter())
+    total_questions = sum(overall_status_counts.values())
+    summary = {
+        "total_questions": total_questions,
+        "good_responses": overall_status_counts["GOOD"],
+        "generic_responses": overall_status_counts["GENERIC"],
+        "error_responses": overall_status_counts["ERROR"]
+    }
+    summary["unknown"] = total_questions - summary["good_responses"] - summary["generic_responses"] - summary["error_responses"]
     
     # Print comprehensive summary
     print("\n" + "=" * 80)
@@ -291,9 +393,9 @@ def run_comprehensive_qa():
     print("\n📈 BREAKDOWN BY CATEGORY:")
     print("-" * 50)
     
-    for category, category_results in results.items():
-        category_good = sum(1 for r in category_results if r["status"] == "GOOD")
-        category_total = len(category_results)
+    for category, status_counts in status_counts_by_category.items():
+        category_good = status_counts["GOOD"]
+        category_total = sum(status_counts.values())
         success_rate = category_good / category_total * 100
         
         print(f"{category}: {category_good}/{category_total} ({success_rate:.1f}%)")
@@ -313,15 +415,20 @@ def run_comprehensive_qa():
                     print(f"     Response: {result['content_preview']}")
                 print()
     
-    # Save detailed results to file
-    with open("qa_prompt_guide_results.json", "w") as f:
-        json.dump({
-            "summary": summary,
-            "detailed_results": results,
-            "timestamp": time.time()
-        }, f, indent=2)
+    # Save the run summary; per-question results were streamed during the run
+    report = {
+        "summary": summary,
+        "timestamp": time.time()
+    }
+    if orjson is not None:
+        with open(SUMMARY_PATH, "wb") as f:
+            f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+    else:
+        with open(SUMMARY_PATH, "w") as f:
+            json.dump(report, f, indent=2)
     
-    print(f"\n💾 Detailed results saved to: qa_prompt_guide_results.json")
+    print(f"\n💾 Detailed results saved to: {RESULTS_PATH}")
+    print(f"💾 Summary saved to: {SUMMARY_PATH}")
     
     # Overall assessment
     success_rate = summary['good_responses'] / summary['total_questions'] * 100
@@ -339,4 +446,7 @@ def run_comprehensive_qa():
     return results, summary
 
 if __name__ == "__main__":
-    run_comprehensive_qa() 
\ No newline at end of file
+    try:
+        run_comprehensive_qa()
+    finally:
+        SESSION.close() 
\ No newline at end of file